@@ -1,20 +1,267 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import messagebox, filedialog
 import customtkinter as ctk
-from PIL import Image, ImageTk, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageTk, ImageDraw, ImageFont
 import requests
 import cv2
 import numpy as np
 import os
-import tempfile
 from datetime import datetime
 import base64
+import hashlib
 import json
+import re
 import threading
-import time
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ['ModernFruitAnalyzerGUI', 'main']
+
+# Optional accelerated codecs (fall back to the standard library)
+try:
+    import pybase64
+    # Encodes straight to str, skipping the intermediate bytes object
+    _b64encode_str = pybase64.b64encode_as_string
+except ImportError:
+    def _b64encode_str(data):
+        return base64.b64encode(data).decode('ascii')
+
+try:
+    from turbojpeg import TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    _turbo_jpeg = None
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True, boundscheck=False)
+    def _fused_analyze(hsv, lab, black_mask):
+        """One pass over HSV/LAB: brown pixel count, black mask and channel sums"""
+        height, width = hsv.shape[0], hsv.shape[1]
+        
+        # Per-row partial sums, reduced once at the end
+        partials = np.zeros((height, 8), dtype=np.float64)
+        for i in prange(height):
+            brown_pixels = 0
+            l_sum = 0
+            l_sumsq = 0
+            a_sum = 0
+            a_sumsq = 0
+            b_sum = 0
+            b_sumsq = 0
+            s_sum = 0
+            for j in range(width):
+                h = hsv[i, j, 0]
+                s = hsv[i, j, 1]
+                v = hsv[i, j, 2]
+                
+                # Same ranges as detect_brown_rot / detect_black_spots
+                if (8 <= h <= 20 and s >= 50 and 20 <= v <= 200) or \
+                   (10 <= h <= 25 and s >= 30 and 10 <= v <= 100):
+                    brown_pixels += 1
+                black_mask[i, j] = 255 if v <= 30 else 0
+                
+                # Integer accumulators: a row of uint8 squares fits easily in int64
+                l = np.int64(lab[i, j, 0])
+                a = np.int64(lab[i, j, 1])
+                b = np.int64(lab[i, j, 2])
+                l_sum += l
+                l_sumsq += l * l
+                a_sum += a
+                a_sumsq += a * a
+                b_sum += b
+                b_sumsq += b * b
+                s_sum += s
+            partials[i, 0] = brown_pixels
+            partials[i, 1] = l_sum
+            partials[i, 2] = l_sumsq
+            partials[i, 3] = a_sum
+            partials[i, 4] = a_sumsq
+            partials[i, 5] = b_sum
+            partials[i, 6] = b_sumsq
+            partials[i, 7] = s_sum
+        
+        totals = partials.sum(axis=0)
+        return (int(totals[0]), totals[1], totals[2], totals[3],
+                totals[4], totals[5], totals[6], totals[7])
+    
+    def _warm_up_kernels():
+        """Compile the JIT kernels before the first user click"""
+        tiny = np.zeros((2, 2, 3), dtype=np.uint8)
+        _fused_analyze(tiny, tiny, np.zeros((2, 2), dtype=np.uint8))
+    
+    @njit(cache=True, parallel=True)
+    def _start_thread_pool(out):
+        """Tiny parallel kernel, run once on the main thread"""
+        for i in prange(out.shape[0]):
+            out[i] = i
+else:
+    _fused_analyze = None
+    _warm_up_kernels = None
+
+# Patterns used to pull the JSON object out of Gemini replies
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+_FENCE_RE = re.compile(r'```json|```')
+
+# Enhanced detailed prompt for careful analysis
+_GEMINI_PROMPT = """
+CRITICAL FRUIT QUALITY INSPECTION - ANALYZE VERY CAREFULLY
+
+You are a professional fruit quality inspector. Examine this fruit image with extreme attention to detail.
+
+INSPECTION CHECKLIST - Check each point carefully:
+
+🔍 VISUAL EXAMINATION:
+1. **Fruit Identification**: What specific type of fruit is this? (apple, orange, banana, etc.)
+2. **Surface Condition**: Examine the entire surface for ANY imperfections
+3. **Color Assessment**: Is the color natural and healthy for this fruit type?
+4. **Texture Analysis**: Is the skin smooth, wrinkled, or damaged?
+
+🚨 DEFECT DETECTION (Look very carefully):
+- Brown spots or discoloration (sign of rot/decay)
+- Black spots or dark patches (mold, severe damage)
+- Holes or punctures (insect damage, physical damage)
+- Soft spots or indentations (bruising, overripeness)
+- Wrinkled or shriveled skin (aging, dehydration)
+- Unusual growths or fuzzy patches (mold)
+- Bite marks or chewed areas (pest damage)
+
+🍎 QUALITY CLASSIFICATION:
+- EXCELLENT: Perfect condition, no defects, optimal ripeness
+- GOOD: Minor imperfections, still fresh and edible
+- FAIR: Some defects present, edible but declining quality
+- POOR: Significant defects, questionable for consumption
+- BAD: Severely damaged, rotten, or unsafe to eat
+- INSECT_DAMAGED: Clear signs of pest damage or holes
+
+⚠️ IMPORTANT: Be very strict in your assessment. If you see ANY signs of decay, rot, mold, or damage, classify accordingly.
+
+🛡️ PREVENTION & REMEDIES:
+Based on the condition, provide:
+- Prevention tips (how to prevent this condition)
+- Storage recommendations
+- Whether to discard or if it can be saved
+- Any treatment suggestions
+
+RESPOND IN THIS EXACT JSON FORMAT:
+{
+    "fruit_type": "exact fruit name",
+    "condition_category": "EXCELLENT/GOOD/FAIR/POOR/BAD/INSECT_DAMAGED",
+    "confidence_score": 90,
+    "detailed_analysis": "Very detailed description of what you observe",
+    "defects_found": ["list all defects you see"],
+    "ripeness": "under-ripe/perfectly-ripe/ripe/overripe/rotten",
+    "freshness_score": 85,
+    "recommendations": "specific recommendation for this fruit",
+    "key_observations": ["list 3-5 key things you noticed"],
+    "safety_assessment": "safe/questionable/unsafe to eat",
+    "prevention_tips": ["how to prevent this condition in future"],
+    "storage_advice": "best storage method for this fruit",
+    "action_required": "consume immediately/use within days/discard/remove from batch"
+}
+
+EXAMINE THE IMAGE VERY CAREFULLY - Don't miss any details!
+"""
+
+# Prompt part is shared by every request payload
+_PROMPT_PART = {"text": _GEMINI_PROMPT}
+
+# Keyword rules for non-JSON Gemini replies, in priority order:
+# (keywords, condition, confidence, action, prevention tips)
+_FALLBACK_RULES = (
+    (('rotten', 'spoiled', 'moldy', 'severely damaged', 'bad condition', 'unsafe', 'decay'),
+     "BAD", 85, "discard",
+     ["Store in cool, dry place", "Check fruits regularly", "Remove damaged fruits immediately"]),
+    (('insect', 'holes', 'bite marks', 'pest damage', 'chewed', 'puncture'),
+     "INSECT_DAMAGED", 80, "remove from batch",
+     ["Use mesh covers", "Regular inspection", "Natural pest repellents"]),
+    (('excellent', 'perfect', 'pristine', 'optimal'),
+     "EXCELLENT", 90, "consume at leisure",
+     ["Continue current storage", "Maintain temperature"]),
+    (('good condition', 'fresh', 'healthy', 'quality'),
+     "GOOD", 85, "consume normally",
+     ["Monitor regularly", "Proper ventilation"]),
+    (('fair', 'moderate', 'declining', 'some defects'),
+     "FAIR", 70, "use within days",
+     ["Improve storage conditions", "Use sooner"]),
+    ((),
+     "POOR", 60, "consume immediately",
+     ["Better selection at purchase", "Improved storage"]),
+)
+_DEFAULT_FALLBACK_RULE = len(_FALLBACK_RULES) - 1
+
+try:
+    import ahocorasick
+    # Single automaton over every keyword, tagged with its rule index
+    _fallback_automaton = ahocorasick.Automaton()
+    for _rule_index, _rule in enumerate(_FALLBACK_RULES):
+        for _word in _rule[0]:
+            _fallback_automaton.add_word(_word, _rule_index)
+    _fallback_automaton.make_automaton()
+    
+    def _match_fallback_rule(text_lower):
+        """Index of the highest-priority rule with a keyword in the text"""
+        best = _DEFAULT_FALLBACK_RULE
+        for _, rule_index in _fallback_automaton.iter(text_lower):
+            if rule_index < best:
+                best = rule_index
+                if best == 0:
+                    break
+        return best
+except ImportError:
+    _fallback_patterns = [
+        re.compile('|'.join(re.escape(word) for word in rule[0]))
+        for rule in _FALLBACK_RULES[:-1]
+    ]
+    
+    def _match_fallback_rule(text_lower):
+        """Index of the highest-priority rule with a keyword in the text"""
+        for rule_index, pattern in enumerate(_fallback_patterns):
+            if pattern.search(text_lower):
+                return rule_index
+        return _DEFAULT_FALLBACK_RULE
+
+# Display label and color for each Gemini condition category
+_CONDITION_LABELS = {
+    'EXCELLENT': "✅ EXCELLENT CONDITION",
+    'GOOD': "✅ GOOD CONDITION",
+    'FAIR': "⚠️ FAIR CONDITION", 
+    'POOR': "⚠️ POOR CONDITION",
+    'BAD': "🚫 BAD CONDITION - DISCARD",
+    'INSECT_DAMAGED': "🐛 INSECT DAMAGE - REMOVE"
+}
+
+_CONDITION_COLORS = {
+    'EXCELLENT': '#00ff00',
+    'GOOD': '#90ee90',
+    'FAIR': '#ffa500',
+    'POOR': '#ff6347',
+    'BAD': '#ff0000',
+    'INSECT_DAMAGED': '#8b0000'
+}
+
+# 8-neighbour Laplacian used for the texture score
+_TEXTURE_KERNEL = np.array([[-1,-1,-1],[-1,8,-1],[-1,-1,-1]], dtype=np.float32)
+
+# Longest edge of the image uploaded to Gemini
+_MAX_UPLOAD_EDGE = 1024
+
+# (connect, read) timeouts for Gemini requests; pool workers aren't daemons,
+# so an unbounded request would keep the process alive after the window closes
+_HTTP_TIMEOUT = (5, 60)
 
 # Set CustomTkinter appearance
 ctk.set_appearance_mode("dark")
@@ -29,6 +276,18 @@ class ModernFruitAnalyzerGUI:
             'X-goog-api-key': self.API_KEY
         }
         
+        # Pooled HTTP session so Gemini calls reuse the TCP/TLS connection
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.http.mount('https://', adapter)
+        threading.Thread(target=self.prewarm_connection, daemon=True).start()
+        
+        # numba's thread pool must be started from the main thread: with the
+        # TBB layer a first parallel launch from a worker hangs the exit.
+        # On a cold cache this compiles a tiny kernel before the first paint
+        if njit is not None:
+            _start_thread_pool(np.empty(2, dtype=np.int64))
+        
         # Initialize main window
         self.root = ctk.CTk()
         self.root.title("🍎 AI-Powered Fruit Quality Analyzer")
@@ -42,6 +301,25 @@ class ModernFruitAnalyzerGUI:
         self.current_image_cv2 = None
         self.analysis_result = None
         
+        # Scratch image buffers reused across analyses (see get_work_buffers)
+        self._bufs = {}
+        self._analyzed_image = None  # image whose intermediates are in self._bufs
+        
+        # Gemini results keyed by image fingerprint (LRU, see analyze_with_gemini)
+        self._response_cache = OrderedDict()
+        self._response_cache_size = 128
+        self._cache_lock = threading.Lock()
+        
+        # Worker pool for analysis jobs; Gemini calls get their own pool so an
+        # analysis job never waits on a future queued behind it in the same pool
+        self._pool = ThreadPoolExecutor(max_workers=4)
+        self._gemini_pool = ThreadPoolExecutor(max_workers=2)
+        if _warm_up_kernels is not None:
+            self._pool.submit(_warm_up_kernels)
+        
+        # Header date only changes between sessions, format it once
+        self._today_str = datetime.now().strftime('%B %d, %Y')
+        
         # Setup UI
         self.setup_ui()
         
@@ -101,7 +379,7 @@ class ModernFruitAnalyzerGUI:
         # Subtitle
         subtitle_label = ctk.CTkLabel(
             header_frame,
-            text=f"Advanced Computer Vision & AI Analysis | {datetime.now().strftime('%B %d, %Y')}",
+            text=f"Advanced Computer Vision & AI Analysis | {self._today_str}",
             font=ctk.CTkFont(family="Arial", size=14),
             text_color="#888888"
         )
@@ -198,6 +476,235 @@ class ModernFruitAnalyzerGUI:
         )
         self.no_results_label.pack(pady=50)
         
+        # Result cards are built once and reconfigured on every analysis
+        self.build_progress_widgets()
+        self.build_result_cards()
+        
+    def build_progress_widgets(self):
+        """Create the analysis progress indicator (hidden until used)"""
+        self.progress_label = ctk.CTkLabel(
+            self.results_scroll,
+            text="⏳ Performing comprehensive analysis...",
+            font=ctk.CTkFont(size=16)
+        )
+        self.progress_bar = ctk.CTkProgressBar(self.results_scroll, width=400)
+        
+    def build_result_cards(self):
+        """Create the result cards once (hidden until results are available)"""
+        # Main condition card
+        self.condition_card = ctk.CTkFrame(self.results_scroll, fg_color="#15253a", corner_radius=15)
+        
+        self.condition_label = ctk.CTkLabel(
+            self.condition_card,
+            text="",
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#ffffff"
+        )
+        self.condition_label.pack(pady=(20, 10))
+        
+        # Confidence score with circular progress
+        confidence_frame = ctk.CTkFrame(self.condition_card, fg_color="transparent")
+        confidence_frame.pack(pady=10)
+        
+        # Ring is pre-rendered with PIL and shown as a single image
+        self.confidence_label = tk.Label(confidence_frame, bg="#15253a", bd=0, highlightthickness=0)
+        self.confidence_label.pack()
+        
+        # Arial on Windows, DejaVu on most Linux installs, else Pillow's scalable default
+        for font_name in ("arial.ttf", "DejaVuSans-Bold.ttf"):
+            try:
+                self._ring_fonts = (ImageFont.truetype(font_name, 56), ImageFont.truetype(font_name, 24))
+                break
+            except OSError:
+                pass
+        else:
+            self._ring_fonts = (ImageFont.load_default(size=56), ImageFont.load_default(size=24))
+        
+        # Fruit type
+        self.fruit_label = ctk.CTkLabel(
+            self.condition_card,
+            text="",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#ffffff"
+        )
+        self.fruit_label.pack(pady=(10, 20))
+        
+        # Action required
+        self.action_frame = ctk.CTkFrame(self.results_scroll, fg_color="#ff0000", corner_radius=10)
+        self.action_label = ctk.CTkLabel(
+            self.action_frame,
+            text="",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#ffffff"
+        )
+        self.action_label.pack(pady=15)
+        
+        # Quality metrics card
+        self.metrics_card = ctk.CTkFrame(self.results_scroll, fg_color="#2a2a2a", corner_radius=15)
+        
+        metrics_title = ctk.CTkLabel(
+            self.metrics_card,
+            text="📊 Quality Metrics",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#ffffff"
+        )
+        metrics_title.pack(pady=(15, 10))
+        
+        self.metric_rows = []
+        for _ in range(4):
+            metric_frame = ctk.CTkFrame(self.metrics_card, fg_color="transparent")
+            metric_frame.pack(fill="x", padx=20, pady=5)
+            
+            # Label
+            label = ctk.CTkLabel(
+                metric_frame,
+                text="",
+                font=ctk.CTkFont(size=14),
+                text_color="#cccccc",
+                width=150,
+                anchor="w"
+            )
+            label.pack(side="left", padx=(0, 10))
+            
+            # Progress bar
+            progress = ctk.CTkProgressBar(metric_frame, width=200, height=20)
+            progress.pack(side="left", padx=10)
+            
+            # Value label
+            value_label = ctk.CTkLabel(
+                metric_frame,
+                text="",
+                font=ctk.CTkFont(size=14, weight="bold")
+            )
+            value_label.pack(side="left", padx=10)
+            
+            self.metric_rows.append((label, progress, value_label))
+        
+        # AI Analysis details
+        self.ai_card = ctk.CTkFrame(self.results_scroll, fg_color="#1a2e1a", corner_radius=15)
+        
+        ai_title = ctk.CTkLabel(
+            self.ai_card,
+            text="🤖 AI Analysis Details",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#ffffff"
+        )
+        ai_title.pack(pady=(15, 10))
+        
+        # Details grid
+        details_frame = ctk.CTkFrame(self.ai_card, fg_color="transparent")
+        details_frame.pack(fill="x", padx=20, pady=10)
+        
+        self.detail_rows = []
+        for label in ("Ripeness:", "Safety:", "Storage:"):
+            detail_frame = ctk.CTkFrame(details_frame, fg_color="transparent")
+            detail_frame.pack(fill="x", pady=3)
+            
+            label_widget = ctk.CTkLabel(
+                detail_frame,
+                text=label,
+                font=ctk.CTkFont(size=14),
+                text_color="#888888",
+                width=100,
+                anchor="w"
+            )
+            label_widget.pack(side="left")
+            
+            value_widget = ctk.CTkLabel(
+                detail_frame,
+                text="",
+                font=ctk.CTkFont(size=14, weight="bold"),
+                anchor="w"
+            )
+            value_widget.pack(side="left", padx=10)
+            
+            self.detail_rows.append(value_widget)
+        
+        # Defects found (variable length, labels are pooled)
+        self.defects_frame = ctk.CTkFrame(self.ai_card, fg_color="#3a1515", corner_radius=10)
+        
+        defects_title = ctk.CTkLabel(
+            self.defects_frame,
+            text="⚠️ Defects Found:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color="#ff6666"
+        )
+        defects_title.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        self.defect_labels = [
+            ctk.CTkLabel(
+                self.defects_frame,
+                text="",
+                font=ctk.CTkFont(size=12),
+                text_color="#ffaaaa",
+                anchor="w"
+            )
+            for _ in range(3)
+        ]
+        
+        # Prevention tips (variable length, labels are pooled)
+        self.tips_card = ctk.CTkFrame(self.results_scroll, fg_color="#2a2a3a", corner_radius=15)
+        
+        tips_title = ctk.CTkLabel(
+            self.tips_card,
+            text="💡 Prevention Tips",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#ffffff"
+        )
+        tips_title.pack(pady=(15, 10))
+        
+        self.tip_labels = [
+            ctk.CTkLabel(
+                self.tips_card,
+                text="",
+                font=ctk.CTkFont(size=13),
+                text_color="#aaaaff",
+                anchor="w",
+                wraplength=600
+            )
+            for _ in range(4)
+        ]
+        
+        # Save report button
+        self.save_btn = ctk.CTkButton(
+            self.results_scroll,
+            text="💾 Save Analysis Report",
+            command=self.save_report,
+            font=ctk.CTkFont(size=16, weight="bold"),
+            height=45,
+            fg_color="#4CAF50",
+            hover_color="#45a049",
+            corner_radius=10
+        )
+        
+    def render_confidence_ring(self, confidence, angle, theme_color):
+        """Render the circular confidence indicator as an anti-aliased image"""
+        # Draw at 2x and downsample for smooth edges
+        scale = 2
+        img = Image.new('RGBA', (150 * scale, 150 * scale), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        box = (25 * scale, 25 * scale, 125 * scale, 125 * scale)
+        
+        # Background circle
+        draw.ellipse(box, outline="#333333", width=10 * scale)
+        
+        # Progress arc (clockwise from 12 o'clock)
+        if angle > 0:
+            draw.arc(box, start=-90, end=-90 + angle, fill=theme_color, width=10 * scale)
+        
+        # Center text
+        value_font, caption_font = self._ring_fonts
+        draw.text((75 * scale, 75 * scale), f"{confidence:.0f}%", font=value_font, fill="white", anchor="mm")
+        draw.text((75 * scale, 100 * scale), "Confidence", font=caption_font, fill="#888888", anchor="mm")
+        
+        img = img.resize((150, 150), Image.Resampling.LANCZOS)
+        return ImageTk.PhotoImage(img)
+        
+    def hide_results_widgets(self):
+        """Hide everything in the results area without destroying it"""
+        for widget in self.results_scroll.winfo_children():
+            widget.pack_forget()
+        
     def capture_from_camera(self):
         """Optimized camera capture"""
         camera_window = ctk.CTkToplevel(self.root)
@@ -236,6 +743,8 @@ class ModernFruitAnalyzerGUI:
                 return
             
             # Optimize camera settings
+            # Request MJPEG before the resolution; YUYV caps most USB cams at ~5-10 fps
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
             cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
@@ -329,7 +838,8 @@ class ModernFruitAnalyzerGUI:
                 self.image_label.configure(text="⏳ Loading image from URL...")
                 self.root.update()
                 
-                response = requests.get(url, stream=True)
+                # Runs on the Tk thread, so a stalled server may only hold the UI briefly
+                response = requests.get(url, stream=True, timeout=(5, 10))
                 if response.status_code == 200:
                     img_array = np.asarray(bytearray(response.content), dtype=np.uint8)
                     image = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
@@ -374,33 +884,32 @@ class ModernFruitAnalyzerGUI:
         # Disable analyze button
         self.analyze_btn.configure(state="disabled", text="🔄 Analyzing...")
         
-        # Clear previous results
-        for widget in self.results_scroll.winfo_children():
-            widget.destroy()
+        # Hide previous results
+        self.hide_results_widgets()
         
         # Show progress
-        progress_label = ctk.CTkLabel(
-            self.results_scroll,
-            text="⏳ Performing comprehensive analysis...",
-            font=ctk.CTkFont(size=16)
-        )
-        progress_label.pack(pady=20)
+        self.progress_label.pack(pady=20)
         
         # Progress bar
-        progress_bar = ctk.CTkProgressBar(self.results_scroll, width=400)
+        progress_bar = self.progress_bar
         progress_bar.pack(pady=10)
         progress_bar.set(0)
         
         # Perform analysis in thread
+        image = self.current_image_cv2
+        
         def analysis_thread():
             try:
-                # Local analysis
+                # Gemini request runs on its own pool while local analysis uses the CPU
                 progress_bar.set(0.3)
-                local_results = self.perform_local_analysis(self.current_image_cv2)
+                gemini_future = self._gemini_pool.submit(self.analyze_with_gemini, image)
+                
+                # Local analysis
+                local_results = self.perform_local_analysis(image)
                 
                 # Gemini AI analysis
                 progress_bar.set(0.6)
-                gemini_results = self.analyze_with_gemini(self.current_image_cv2)
+                gemini_results = gemini_future.result()
                 
                 # Combine results
                 progress_bar.set(0.9)
@@ -409,7 +918,7 @@ class ModernFruitAnalyzerGUI:
                 progress_bar.set(1.0)
                 
                 # Update UI in main thread
-                self.root.after(100, lambda: self.display_analysis_results(final_result))
+                self.root.after(0, lambda: self.display_analysis_results(final_result))
                 
             except Exception as e:
                 self.root.after(100, lambda: messagebox.showerror("Error", f"Analysis failed: {str(e)}"))
@@ -419,15 +928,13 @@ class ModernFruitAnalyzerGUI:
                     text="🔬 Analyze Fruit Quality"
                 ))
         
-        # Start analysis thread
-        thread = threading.Thread(target=analysis_thread, daemon=True)
-        thread.start()
+        # Start analysis on the worker pool
+        self._pool.submit(analysis_thread)
         
     def display_analysis_results(self, result):
         """Display analysis results in modern UI"""
-        # Clear scroll frame
-        for widget in self.results_scroll.winfo_children():
-            widget.destroy()
+        # Hide progress/previous results; the cards are updated in place
+        self.hide_results_widgets()
         
         # Store result
         self.analysis_result = result
@@ -447,76 +954,28 @@ class ModernFruitAnalyzerGUI:
             bg_color = "#15253a"
         
         # Main condition card
-        condition_card = ctk.CTkFrame(self.results_scroll, fg_color=bg_color, corner_radius=15)
-        condition_card.pack(fill="x", padx=10, pady=10)
-        
-        # Condition text
-        condition_label = ctk.CTkLabel(
-            condition_card,
-            text=result['condition'],
-            font=ctk.CTkFont(size=24, weight="bold"),
-            text_color="#ffffff"
-        )
-        condition_label.pack(pady=(20, 10))
-        
-        # Confidence score with circular progress
-        confidence_frame = ctk.CTkFrame(condition_card, fg_color="transparent")
-        confidence_frame.pack(pady=10)
-        
-        # Create circular progress using Canvas
-        canvas = tk.Canvas(confidence_frame, width=150, height=150, bg=bg_color, highlightthickness=0)
-        canvas.pack()
+        self.condition_card.configure(fg_color=bg_color)
+        self.condition_card.pack(fill="x", padx=10, pady=10)
+        self.condition_label.configure(text=result['condition'])
         
-        # Draw circular progress
+        # Circular confidence progress
         confidence = result['confidence']
         angle = int(360 * (confidence / 100))
         
-        # Background circle
-        canvas.create_oval(25, 25, 125, 125, outline="#333333", width=10)
-        
-        # Progress arc
-        canvas.create_arc(25, 25, 125, 125, start=90, extent=-angle, 
-                         outline=theme_color, width=10, style="arc")
-        
-        # Center text
-        canvas.create_text(75, 75, text=f"{confidence:.0f}%", 
-                          font=("Arial", 28, "bold"), fill="white")
-        canvas.create_text(75, 100, text="Confidence", 
-                          font=("Arial", 12), fill="#888888")
+        photo = self.render_confidence_ring(confidence, angle, theme_color)
+        self.confidence_label.configure(image=photo, bg=bg_color)
+        self.confidence_label.image = photo  # Keep reference
         
         # Fruit type
-        fruit_label = ctk.CTkLabel(
-            condition_card,
-            text=f"🍎 {result['fruit_type'].upper()}",
-            font=ctk.CTkFont(size=18, weight="bold"),
-            text_color="#ffffff"
-        )
-        fruit_label.pack(pady=(10, 20))
+        self.fruit_label.configure(text=f"🍎 {result['fruit_type'].upper()}")
         
         # Action required (if bad)
         if 'action_required' in result:
-            action_frame = ctk.CTkFrame(self.results_scroll, fg_color="#ff0000", corner_radius=10)
-            action_frame.pack(fill="x", padx=10, pady=5)
-            
-            action_label = ctk.CTkLabel(
-                action_frame,
-                text=f"⚠️ {result['action_required'].upper()} ⚠️",
-                font=ctk.CTkFont(size=18, weight="bold"),
-                text_color="#ffffff"
-            )
-            action_label.pack(pady=15)
+            self.action_label.configure(text=f"⚠️ {result['action_required'].upper()} ⚠️")
+            self.action_frame.pack(fill="x", padx=10, pady=5)
         
         # Quality metrics card
-        metrics_card = ctk.CTkFrame(self.results_scroll, fg_color="#2a2a2a", corner_radius=15)
-        metrics_card.pack(fill="x", padx=10, pady=10)
-        
-        metrics_title = ctk.CTkLabel(
-            metrics_card,
-            text="📊 Quality Metrics",
-            font=ctk.CTkFont(size=18, weight="bold"),
-            text_color="#ffffff"
-        )
-        metrics_title.pack(pady=(15, 10))
+        self.metrics_card.pack(fill="x", padx=10, pady=10)
         
         # Metrics data
         local = result['local_analysis']
@@ -527,79 +986,28 @@ class ModernFruitAnalyzerGUI:
             ("Shape Quality", local['shape_integrity'], "#00bfff", False)
         ]
         
-        for metric_name, value, color, is_defect in metrics_data:
-            metric_frame = ctk.CTkFrame(metrics_card, fg_color="transparent")
-            metric_frame.pack(fill="x", padx=20, pady=5)
-            
-            # Label
-            label = ctk.CTkLabel(
-                metric_frame,
-                text=metric_name,
-                font=ctk.CTkFont(size=14),
-                text_color="#cccccc",
-                width=150,
-                anchor="w"
-            )
-            label.pack(side="left", padx=(0, 10))
-            
-            # Progress bar
-            progress = ctk.CTkProgressBar(
-                metric_frame,
-                width=200,
-                height=20,
-                progress_color=color if not (is_defect and value > 5) else "#ff0000"
-            )
-            progress.pack(side="left", padx=10)
+        for (label, progress, value_label), (metric_name, value, color, is_defect) in zip(self.metric_rows, metrics_data):
+            label.configure(text=metric_name)
+            progress.configure(progress_color=color if not (is_defect and value > 5) else "#ff0000")
             progress.set(value / 100)
-            
-            # Value label
-            value_label = ctk.CTkLabel(
-                metric_frame,
+            value_label.configure(
                 text=f"{value:.1f}%",
-                font=ctk.CTkFont(size=14, weight="bold"),
                 text_color=color if not (is_defect and value > 5) else "#ff6666"
             )
-            value_label.pack(side="left", padx=10)
         
         # AI Analysis details
         if result.get('gemini_analysis'):
-            ai_card = ctk.CTkFrame(self.results_scroll, fg_color="#1a2e1a", corner_radius=15)
-            ai_card.pack(fill="x", padx=10, pady=10)
-            
-            ai_title = ctk.CTkLabel(
-                ai_card,
-                text="🤖 AI Analysis Details",
-                font=ctk.CTkFont(size=18, weight="bold"),
-                text_color="#ffffff"
-            )
-            ai_title.pack(pady=(15, 10))
+            self.ai_card.pack(fill="x", padx=10, pady=10)
             
             gemini = result['gemini_analysis']
             
-            # Details grid
-            details_frame = ctk.CTkFrame(ai_card, fg_color="transparent")
-            details_frame.pack(fill="x", padx=20, pady=10)
-            
             details = [
-                ("Ripeness:", gemini.get('ripeness', 'N/A')),
-                ("Safety:", gemini.get('safety_assessment', 'N/A')),
-                ("Storage:", gemini.get('storage_advice', 'N/A')[:50] + "..." if len(gemini.get('storage_advice', '')) > 50 else gemini.get('storage_advice', 'N/A'))
+                gemini.get('ripeness', 'N/A'),
+                gemini.get('safety_assessment', 'N/A'),
+                gemini.get('storage_advice', 'N/A')[:50] + "..." if len(gemini.get('storage_advice', '')) > 50 else gemini.get('storage_advice', 'N/A')
             ]
             
-            for label, value in details:
-                detail_frame = ctk.CTkFrame(details_frame, fg_color="transparent")
-                detail_frame.pack(fill="x", pady=3)
-                
-                label_widget = ctk.CTkLabel(
-                    detail_frame,
-                    text=label,
-                    font=ctk.CTkFont(size=14),
-                    text_color="#888888",
-                    width=100,
-                    anchor="w"
-                )
-                label_widget.pack(side="left")
-                
+            for value_widget, value in zip(self.detail_rows, details):
                 # Determine color
                 if 'unsafe' in str(value).lower():
                     value_color = "#ff6666"
@@ -608,76 +1016,33 @@ class ModernFruitAnalyzerGUI:
                 else:
                     value_color = "#ffffff"
                 
-                value_widget = ctk.CTkLabel(
-                    detail_frame,
-                    text=str(value),
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    text_color=value_color,
-                    anchor="w"
-                )
-                value_widget.pack(side="left", padx=10)
+                value_widget.configure(text=str(value), text_color=value_color)
             
             # Defects found
+            self.defects_frame.pack_forget()
+            for defect_label in self.defect_labels:
+                defect_label.pack_forget()
+            
             if gemini.get('defects_found'):
-                defects_frame = ctk.CTkFrame(ai_card, fg_color="#3a1515", corner_radius=10)
-                defects_frame.pack(fill="x", padx=20, pady=10)
+                self.defects_frame.pack(fill="x", padx=20, pady=10)
                 
-                defects_title = ctk.CTkLabel(
-                    defects_frame,
-                    text="⚠️ Defects Found:",
-                    font=ctk.CTkFont(size=14, weight="bold"),
-                    text_color="#ff6666"
-                )
-                defects_title.pack(anchor="w", padx=10, pady=(10, 5))
-                
-                for defect in gemini['defects_found'][:3]:
-                    defect_label = ctk.CTkLabel(
-                        defects_frame,
-                        text=f"• {defect}",
-                        font=ctk.CTkFont(size=12),
-                        text_color="#ffaaaa",
-                        anchor="w"
-                    )
+                for defect_label, defect in zip(self.defect_labels, gemini['defects_found'][:3]):
+                    defect_label.configure(text=f"• {defect}")
                     defect_label.pack(anchor="w", padx=20, pady=2)
         
         # Prevention tips
         if result.get('prevention_tips'):
-            tips_card = ctk.CTkFrame(self.results_scroll, fg_color="#2a2a3a", corner_radius=15)
-            tips_card.pack(fill="x", padx=10, pady=10)
-            
-            tips_title = ctk.CTkLabel(
-                tips_card,
-                text="💡 Prevention Tips",
-                font=ctk.CTkFont(size=18, weight="bold"),
-                text_color="#ffffff"
-            )
-            tips_title.pack(pady=(15, 10))
+            for tip_label in self.tip_labels:
+                tip_label.pack_forget()
             
-            for tip in result['prevention_tips'][:4]:
-                tip_label = ctk.CTkLabel(
-                    tips_card,
-                    text=f"• {tip}",
-                    font=ctk.CTkFont(size=13),
-                    text_color="#aaaaff",
-                    anchor="w",
-                    wraplength=600
-                )
+            for tip_label, tip in zip(self.tip_labels, result['prevention_tips'][:4]):
+                tip_label.configure(text=f"• {tip}")
                 tip_label.pack(anchor="w", padx=30, pady=3)
             
-            tips_card.pack(pady=(0, 20))  # Extra padding at bottom
+            self.tips_card.pack(fill="x", padx=10, pady=(0, 20))  # Extra padding at bottom
         
         # Save report button
-        save_btn = ctk.CTkButton(
-            self.results_scroll,
-            text="💾 Save Analysis Report",
-            command=self.save_report,
-            font=ctk.CTkFont(size=16, weight="bold"),
-            height=45,
-            fg_color="#4CAF50",
-            hover_color="#45a049",
-            corner_radius=10
-        )
-        save_btn.pack(pady=20)
+        self.save_btn.pack(pady=20)
         
         # Show defect overlay
         self.show_defect_overlay()
@@ -685,10 +1050,18 @@ class ModernFruitAnalyzerGUI:
     def show_defect_overlay(self):
         """Show defect overlay on the image"""
         if self.current_image_cv2 is not None and self.analysis_result is not None:
+            # Reuse the HSV image and black mask left in the scratch buffers
+            # when they belong to the image being shown
+            if self._analyzed_image is self.current_image_cv2:
+                cached = {'hsv': self._bufs['hsv'], 'black_mask': self._bufs['black_mask']}
+            else:
+                cached = {}
+            
             # Create overlay
             overlay_image = self.create_enhanced_analysis_overlay(
                 self.current_image_cv2, 
-                self.analysis_result['local_analysis']
+                self.analysis_result['local_analysis'],
+                **cached
             )
             
             # Convert and display
@@ -779,83 +1152,65 @@ class ModernFruitAnalyzerGUI:
     # Include all the analysis methods from the original code
     def encode_image_base64(self, image):
         """Convert OpenCV image to base64 for Gemini API"""
-        _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
-        image_base64 = base64.b64encode(buffer).decode('utf-8')
+        # The model does not need more than ~1024 px; smaller uploads are faster
+        height, width = image.shape[:2]
+        scale = _MAX_UPLOAD_EDGE / max(height, width)
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        if _turbo_jpeg is not None:
+            # libjpeg-turbo SIMD encoder
+            buffer = _turbo_jpeg.encode(image, quality=90)
+        else:
+            _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        # JPEG buffer is passed through the buffer protocol, no tobytes() copy
+        image_base64 = _b64encode_str(buffer)
         return image_base64
     
+    def prewarm_connection(self):
+        """Open the Gemini connection ahead of the first analysis"""
+        try:
+            # Any request to the host opens the pooled TLS connection; the API key
+            # header is left off so it is only ever sent with real requests
+            self.http.head("https://generativelanguage.googleapis.com/", timeout=5)
+        except requests.RequestException:
+            pass
+    
+    def image_fingerprint(self, image):
+        """Exact digest of the pixels and shape, so only the very same image hits the cache"""
+        # A perceptual hash would also match a photo with a few new spots on it
+        digest = hashlib.blake2b(np.ascontiguousarray(image), digest_size=16)
+        digest.update(np.asarray(image.shape, dtype=np.int64))
+        return digest.digest()
+    
     def analyze_with_gemini(self, image):
         """Analyze image using Gemini REST API with enhanced prompt"""
+        # Re-analyzing the same image skips the API call
+        key = self.image_fingerprint(image)
+        with self._cache_lock:
+            if key in self._response_cache:
+                self._response_cache.move_to_end(key)
+                return self._response_cache[key]
+        
+        result = self.request_gemini_analysis(image)
+        if result is not None:
+            with self._cache_lock:
+                self._response_cache[key] = result
+                if len(self._response_cache) > self._response_cache_size:
+                    self._response_cache.popitem(last=False)
+        return result
+    
+    def request_gemini_analysis(self, image):
+        """Send the image to the Gemini REST API and parse the reply"""
         try:
             # Convert image to base64
             image_base64 = self.encode_image_base64(image)
             
-            # Enhanced detailed prompt for careful analysis
-            prompt = """
-            CRITICAL FRUIT QUALITY INSPECTION - ANALYZE VERY CAREFULLY
-            
-            You are a professional fruit quality inspector. Examine this fruit image with extreme attention to detail.
-            
-            INSPECTION CHECKLIST - Check each point carefully:
-            
-            🔍 VISUAL EXAMINATION:
-            1. **Fruit Identification**: What specific type of fruit is this? (apple, orange, banana, etc.)
-            2. **Surface Condition**: Examine the entire surface for ANY imperfections
-            3. **Color Assessment**: Is the color natural and healthy for this fruit type?
-            4. **Texture Analysis**: Is the skin smooth, wrinkled, or damaged?
-            
-            🚨 DEFECT DETECTION (Look very carefully):
-            - Brown spots or discoloration (sign of rot/decay)
-            - Black spots or dark patches (mold, severe damage)
-            - Holes or punctures (insect damage, physical damage)
-            - Soft spots or indentations (bruising, overripeness)
-            - Wrinkled or shriveled skin (aging, dehydration)
-            - Unusual growths or fuzzy patches (mold)
-            - Bite marks or chewed areas (pest damage)
-            
-            🍎 QUALITY CLASSIFICATION:
-            - EXCELLENT: Perfect condition, no defects, optimal ripeness
-            - GOOD: Minor imperfections, still fresh and edible
-            - FAIR: Some defects present, edible but declining quality
-            - POOR: Significant defects, questionable for consumption
-            - BAD: Severely damaged, rotten, or unsafe to eat
-            - INSECT_DAMAGED: Clear signs of pest damage or holes
-            
-            ⚠️ IMPORTANT: Be very strict in your assessment. If you see ANY signs of decay, rot, mold, or damage, classify accordingly.
-            
-            🛡️ PREVENTION & REMEDIES:
-            Based on the condition, provide:
-            - Prevention tips (how to prevent this condition)
-            - Storage recommendations
-            - Whether to discard or if it can be saved
-            - Any treatment suggestions
-            
-            RESPOND IN THIS EXACT JSON FORMAT:
-            {
-                "fruit_type": "exact fruit name",
-                "condition_category": "EXCELLENT/GOOD/FAIR/POOR/BAD/INSECT_DAMAGED",
-                "confidence_score": 90,
-                "detailed_analysis": "Very detailed description of what you observe",
-                "defects_found": ["list all defects you see"],
-                "ripeness": "under-ripe/perfectly-ripe/ripe/overripe/rotten",
-                "freshness_score": 85,
-                "recommendations": "specific recommendation for this fruit",
-                "key_observations": ["list 3-5 key things you noticed"],
-                "safety_assessment": "safe/questionable/unsafe to eat",
-                "prevention_tips": ["how to prevent this condition in future"],
-                "storage_advice": "best storage method for this fruit",
-                "action_required": "consume immediately/use within days/discard/remove from batch"
-            }
-            
-            EXAMINE THE IMAGE VERY CAREFULLY - Don't miss any details!
-            """
-
             payload = {
                 "contents": [
                     {
                         "parts": [
-                            {
-                                "text": prompt
-                            },
+                            _PROMPT_PART,
                             {
                                 "inline_data": {
                                     "mime_type": "image/jpeg",
@@ -867,10 +1222,11 @@ class ModernFruitAnalyzerGUI:
                 ]
             }
 
-            response = requests.post(self.gemini_url, headers=self.headers, json=payload)
+            response = self.http.post(self.gemini_url, headers=self.headers, data=_json_dumps(payload),
+                                      timeout=_HTTP_TIMEOUT)
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 if 'candidates' in result and len(result['candidates']) > 0:
                     text_response = result['candidates'][0]['content']['parts'][0]['text']
                     return self.parse_gemini_response(text_response)
@@ -883,12 +1239,11 @@ class ModernFruitAnalyzerGUI:
     def parse_gemini_response(self, response_text):
         """Parse Gemini's response and extract structured data"""
         try:
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = _JSON_RE.search(response_text)
             if json_match:
                 json_str = json_match.group()
-                json_str = re.sub(r'```json|```', '', json_str).strip()
-                gemini_analysis = json.loads(json_str)
+                json_str = _FENCE_RE.sub('', json_str).strip()
+                gemini_analysis = _json_loads(json_str)
                 return gemini_analysis
             else:
                 return self.create_fallback_analysis(response_text)
@@ -899,36 +1254,7 @@ class ModernFruitAnalyzerGUI:
         """Create structured analysis when JSON parsing fails"""
         text_lower = response_text.lower()
 
-        if any(word in text_lower for word in ['rotten', 'spoiled', 'moldy', 'severely damaged', 'bad condition', 'unsafe', 'decay']):
-            condition = "BAD"
-            confidence = 85
-            action = "discard"
-            prevention = ["Store in cool, dry place", "Check fruits regularly", "Remove damaged fruits immediately"]
-        elif any(word in text_lower for word in ['insect', 'holes', 'bite marks', 'pest damage', 'chewed', 'puncture']):
-            condition = "INSECT_DAMAGED"
-            confidence = 80
-            action = "remove from batch"
-            prevention = ["Use mesh covers", "Regular inspection", "Natural pest repellents"]
-        elif any(word in text_lower for word in ['excellent', 'perfect', 'pristine', 'optimal']):
-            condition = "EXCELLENT"
-            confidence = 90
-            action = "consume at leisure"
-            prevention = ["Continue current storage", "Maintain temperature"]
-        elif any(word in text_lower for word in ['good condition', 'fresh', 'healthy', 'quality']):
-            condition = "GOOD"
-            confidence = 85
-            action = "consume normally"
-            prevention = ["Monitor regularly", "Proper ventilation"]
-        elif any(word in text_lower for word in ['fair', 'moderate', 'declining', 'some defects']):
-            condition = "FAIR"
-            confidence = 70
-            action = "use within days"
-            prevention = ["Improve storage conditions", "Use sooner"]
-        else:
-            condition = "POOR"
-            confidence = 60
-            action = "consume immediately"
-            prevention = ["Better selection at purchase", "Improved storage"]
+        condition, confidence, action, prevention = _FALLBACK_RULES[_match_fallback_rule(text_lower)][1:]
 
         return {
             "fruit_type": "unknown",
@@ -941,7 +1267,7 @@ class ModernFruitAnalyzerGUI:
             "recommendations": "Based on AI analysis",
             "key_observations": [response_text[:100] + "..."],
             "safety_assessment": "questionable",
-            "prevention_tips": prevention,
+            "prevention_tips": list(prevention),
             "storage_advice": "Store properly",
             "action_required": action
         }
@@ -949,16 +1275,25 @@ class ModernFruitAnalyzerGUI:
     def perform_local_analysis(self, image):
         """Local computer vision analysis for fruit quality"""
         # Convert to different color spaces
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+        bufs = self.get_work_buffers(image)
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=bufs['hsv'])
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=bufs['lab'])
         
         # Perform various analyses
-        brown_rot_analysis = self.detect_brown_rot(hsv)
-        black_spot_analysis = self.detect_black_spots(hsv)
-        color_variance = self.analyze_color_uniformity(image)
+        if _fused_analyze is not None:
+            # Pixel statistics in a single JIT-compiled pass
+            brown_rot_analysis, black_spot_analysis, color_variance, freshness_score = \
+                self.fused_pixel_analysis(hsv, lab)
+        else:
+            brown_rot_analysis = self.detect_brown_rot(hsv)
+            black_spot_analysis = self.detect_black_spots(hsv)
+            color_variance = self.analyze_color_uniformity(lab)
+            freshness_score = self.calculate_freshness_score(hsv, lab)
         texture_analysis = self.analyze_texture_quality(image)
         contour_analysis = self.analyze_fruit_shape(image)
-        freshness_score = self.calculate_freshness_score(hsv, lab)
+        
+        # HSV and the raw black mask stay in self._bufs for the overlay
+        self._analyzed_image = image
         
         return {
             'brown_rot_percentage': brown_rot_analysis,
@@ -969,17 +1304,71 @@ class ModernFruitAnalyzerGUI:
             'freshness_score': freshness_score
         }
     
+    def get_work_buffers(self, image):
+        """Return scratch buffers sized for image, reallocating only when the size changes"""
+        height, width = image.shape[:2]
+        if self._bufs.get('shape') != (height, width):
+            self._bufs = {
+                'shape': (height, width),
+                'hsv': np.empty((height, width, 3), np.uint8),
+                'lab': np.empty((height, width, 3), np.uint8),
+                'mask1': np.empty((height, width), np.uint8),
+                'mask2': np.empty((height, width), np.uint8),
+                'combined': np.empty((height, width), np.uint8),
+                'black_mask': np.empty((height, width), np.uint8),
+                'black_closed': np.empty((height, width), np.uint8),
+                'gray': np.empty((height, width), np.uint8),
+                'blurred': np.empty((height, width), np.uint8),
+                'shape_mask': np.empty((height, width), np.uint8),
+                'texture': np.empty((height, width), np.int16),
+                'overlay': np.empty((height, width, 3), np.uint8),
+                'result': np.empty((height, width, 3), np.uint8),
+                # Solid color layers copied through the defect masks in the overlay
+                'brown_layer': np.full((height, width, 3), (0, 165, 255), np.uint8),
+                'black_layer': np.full((height, width, 3), (0, 0, 255), np.uint8),
+            }
+        return self._bufs
+    
+    def fused_pixel_analysis(self, hsv_image, lab_image):
+        """Brown, black, color uniformity and freshness metrics from one kernel pass"""
+        bufs = self.get_work_buffers(hsv_image)
+        black_mask = bufs['black_mask']
+        (brown_pixels, l_sum, l_sumsq, a_sum, a_sumsq,
+         b_sum, b_sumsq, s_sum) = _fused_analyze(hsv_image, lab_image, black_mask)
+        
+        total_pixels = hsv_image.shape[0] * hsv_image.shape[1]
+        brown_percentage = round((brown_pixels / total_pixels) * 100, 2)
+        
+        # Black spots still need the morphological close before counting
+        kernel = np.ones((3,3), np.uint8)
+        black_mask = cv2.morphologyEx(black_mask, cv2.MORPH_CLOSE, kernel, dst=bufs['black_closed'])
+        black_percentage = round((cv2.countNonZero(black_mask) / total_pixels) * 100, 2)
+        
+        # Population std from sum / sum of squares
+        stds = []
+        for channel_sum, channel_sumsq in ((l_sum, l_sumsq), (a_sum, a_sumsq), (b_sum, b_sumsq)):
+            mean = channel_sum / total_pixels
+            stds.append(np.sqrt(max(channel_sumsq / total_pixels - mean * mean, 0.0)))
+        color_variance = round(sum(stds) / 3, 2)
+        
+        brightness_score = min(100, (l_sum / total_pixels / 255) * 100)
+        saturation_score = min(100, (s_sum / total_pixels / 255) * 100)
+        freshness = round((brightness_score + saturation_score) / 2, 2)
+        
+        return brown_percentage, black_percentage, color_variance, freshness
+    
     def detect_brown_rot(self, hsv_image):
         """Detect brown/rotten areas"""
+        bufs = self.get_work_buffers(hsv_image)
         brown_lower1 = np.array([8, 50, 20])
         brown_upper1 = np.array([20, 255, 200])
-        brown_mask1 = cv2.inRange(hsv_image, brown_lower1, brown_upper1)
+        brown_mask1 = cv2.inRange(hsv_image, brown_lower1, brown_upper1, dst=bufs['mask1'])
         
         brown_lower2 = np.array([10, 30, 10])
         brown_upper2 = np.array([25, 255, 100])
-        brown_mask2 = cv2.inRange(hsv_image, brown_lower2, brown_upper2)
+        brown_mask2 = cv2.inRange(hsv_image, brown_lower2, brown_upper2, dst=bufs['mask2'])
         
-        combined_brown = cv2.bitwise_or(brown_mask1, brown_mask2)
+        combined_brown = cv2.bitwise_or(brown_mask1, brown_mask2, dst=bufs['combined'])
         total_pixels = hsv_image.shape[0] * hsv_image.shape[1]
         brown_pixels = cv2.countNonZero(combined_brown)
         brown_percentage = (brown_pixels / total_pixels) * 100
@@ -988,12 +1377,13 @@ class ModernFruitAnalyzerGUI:
     
     def detect_black_spots(self, hsv_image):
         """Detect black spots (severe damage/mold)"""
+        bufs = self.get_work_buffers(hsv_image)
         black_lower = np.array([0, 0, 0])
         black_upper = np.array([180, 255, 30])
-        black_mask = cv2.inRange(hsv_image, black_lower, black_upper)
+        black_mask = cv2.inRange(hsv_image, black_lower, black_upper, dst=bufs['black_mask'])
         
         kernel = np.ones((3,3), np.uint8)
-        black_mask = cv2.morphologyEx(black_mask, cv2.MORPH_CLOSE, kernel)
+        black_mask = cv2.morphologyEx(black_mask, cv2.MORPH_CLOSE, kernel, dst=bufs['black_closed'])
         
         total_pixels = hsv_image.shape[0] * hsv_image.shape[1]
         black_pixels = cv2.countNonZero(black_mask)
@@ -1001,34 +1391,45 @@ class ModernFruitAnalyzerGUI:
         
         return round(black_percentage, 2)
     
-    def analyze_color_uniformity(self, image):
+    def analyze_color_uniformity(self, lab_image):
         """Analyze color uniformity"""
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l_std = np.std(lab[:,:,0])
-        a_std = np.std(lab[:,:,1])
-        b_std = np.std(lab[:,:,2])
-        color_variance = (l_std + a_std + b_std) / 3
+        # All three channel stds in one pass over the interleaved LAB image
+        _, stds = cv2.meanStdDev(lab_image)
+        color_variance = float(stds.mean())
         return round(color_variance, 2)
     
     def analyze_texture_quality(self, image):
         """Analyze texture quality"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        kernel = np.array([[-1,-1,-1],[-1,8,-1],[-1,-1,-1]])
-        texture_response = cv2.filter2D(gray, cv2.CV_32F, kernel)
-        texture_score = np.mean(np.abs(texture_response))
+        bufs = self.get_work_buffers(image)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=bufs['gray'])
+        # 16-bit response (range +/-2040) moves half the bytes of float32
+        texture_response = cv2.filter2D(gray, cv2.CV_16S, _TEXTURE_KERNEL, dst=bufs['texture'])
+        np.abs(texture_response, out=texture_response)
+        texture_score = cv2.mean(texture_response)[0]
         return round(texture_score, 2)
     
     def analyze_fruit_shape(self, image):
         """Analyze fruit shape integrity"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        edges = cv2.Canny(blurred, 50, 150)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        if contours:
-            largest_contour = max(contours, key=cv2.contourArea)
-            area = cv2.contourArea(largest_contour)
-            perimeter = cv2.arcLength(largest_contour, True)
+        bufs = self.get_work_buffers(image)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=bufs['gray'])
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=bufs['blurred'])
+        
+        # Separate fruit from background; the background is whatever covers the border
+        _, mask = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=bufs['shape_mask'])
+        border = np.concatenate((mask[0], mask[-1], mask[:, 0], mask[:, -1]))
+        if np.count_nonzero(border) > border.size // 2:
+            cv2.bitwise_not(mask, dst=mask)
+        
+        # Largest connected region is the fruit
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if count > 1:
+            largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+            area = stats[largest, cv2.CC_STAT_AREA]
+            
+            # Only the single outline of that region is traced
+            fruit_mask = cv2.compare(labels, largest, cv2.CMP_EQ, dst=mask)
+            contours, _ = cv2.findContours(fruit_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            perimeter = cv2.arcLength(contours[0], True) if contours else 0
             if perimeter > 0:
                 circularity = 4 * np.pi * area / (perimeter * perimeter)
                 return min(100, round(circularity * 100, 2))
@@ -1054,26 +1455,8 @@ class ModernFruitAnalyzerGUI:
             ai_condition = gemini_result.get('condition_category', 'FAIR')
             ai_confidence = gemini_result.get('confidence_score', 50)
             
-            condition_mapping = {
-                'EXCELLENT': "✅ EXCELLENT CONDITION",
-                'GOOD': "✅ GOOD CONDITION",
-                'FAIR': "⚠️ FAIR CONDITION", 
-                'POOR': "⚠️ POOR CONDITION",
-                'BAD': "🚫 BAD CONDITION - DISCARD",
-                'INSECT_DAMAGED': "🐛 INSECT DAMAGE - REMOVE"
-            }
-            
-            color_mapping = {
-                'EXCELLENT': '#00ff00',
-                'GOOD': '#90ee90',
-                'FAIR': '#ffa500',
-                'POOR': '#ff6347',
-                'BAD': '#ff0000',
-                'INSECT_DAMAGED': '#8b0000'
-            }
-            
-            condition = condition_mapping.get(ai_condition, "❓ UNCLEAR")
-            color = color_mapping.get(ai_condition, '#808080')
+            condition = _CONDITION_LABELS.get(ai_condition, "❓ UNCLEAR")
+            color = _CONDITION_COLORS.get(ai_condition, '#808080')
             
             local_bad_score = (local_analysis['brown_rot_percentage'] * 2 + 
                               local_analysis['black_spots_percentage'] * 3)
@@ -1124,27 +1507,36 @@ class ModernFruitAnalyzerGUI:
         
         return result
     
-    def create_enhanced_analysis_overlay(self, image, local_analysis):
-        """Create enhanced analysis overlay with better visualization"""
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        overlay = image.copy()
+    def create_enhanced_analysis_overlay(self, image, local_analysis, hsv=None, brown_mask=None, black_mask=None):
+        """Create enhanced analysis overlay with better visualization
+        
+        hsv, brown_mask and black_mask can be passed in from perform_local_analysis
+        to skip recomputing them.
+        """
+        bufs = self.get_work_buffers(image)
+        if hsv is None and (brown_mask is None or black_mask is None):
+            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=bufs['hsv'])
+        overlay = bufs['overlay']
+        np.copyto(overlay, image)
         
         # Brown rot detection
-        brown_lower1 = np.array([8, 50, 20])
-        brown_upper1 = np.array([20, 255, 200])
-        brown_mask1 = cv2.inRange(hsv, brown_lower1, brown_upper1)
+        if brown_mask is None:
+            brown_lower1 = np.array([8, 50, 20])
+            brown_upper1 = np.array([20, 255, 200])
+            brown_mask = cv2.inRange(hsv, brown_lower1, brown_upper1, dst=bufs['mask1'])
         
         # Black spots detection
-        black_lower = np.array([0, 0, 0])
-        black_upper = np.array([180, 255, 30])
-        black_mask = cv2.inRange(hsv, black_lower, black_upper)
+        if black_mask is None:
+            black_lower = np.array([0, 0, 0])
+            black_upper = np.array([180, 255, 30])
+            black_mask = cv2.inRange(hsv, black_lower, black_upper, dst=bufs['black_mask'])
         
         # Apply colored overlays
-        overlay[brown_mask1 > 0] = [0, 165, 255]  # Orange for brown areas (BGR)
-        overlay[black_mask > 0] = [0, 0, 255]      # Red for black spots (BGR)
+        cv2.copyTo(bufs['brown_layer'], brown_mask, dst=overlay)  # Orange for brown areas (BGR)
+        cv2.copyTo(bufs['black_layer'], black_mask, dst=overlay)  # Red for black spots (BGR)
         
         # Blend with original
-        result = cv2.addWeighted(image, 0.6, overlay, 0.4, 0)
+        result = cv2.addWeighted(image, 0.6, overlay, 0.4, 0, dst=bufs['result'])
         
         # Add text overlay
         font = cv2.FONT_HERSHEY_SIMPLEX
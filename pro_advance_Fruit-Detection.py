@@ -8,19 +8,112 @@ import numpy as np
 import os
 from datetime import datetime
 import base64
+import hashlib
 import json
 import threading
 import time
 import queue
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# OpenCV releases the GIL inside its calls; let each one use half the cores so
+# two analyses running on the worker pool don't oversubscribe the CPU
+cv2.setNumThreads(max(2, (os.cpu_count() or 2) // 2))
+
+# Longest image edge used for analysis; neither the local metrics nor Gemini
+# gain anything from larger inputs
+_MAX_ANALYSIS_EDGE = 1024
+
+# (connect, read) timeouts for Gemini requests; pool workers aren't daemons,
+# so an unbounded request would keep the process alive after closing
+_HTTP_TIMEOUT = (5, 60)
+
+# Fixed thresholds and kernels of the local metrics, built once instead of per call
+_BROWN_LOW = np.array([8, 50, 20], dtype=np.uint8)
+_BROWN_HIGH = np.array([20, 255, 200], dtype=np.uint8)
+_BLACK_LOW = np.array([0, 0, 0], dtype=np.uint8)
+_BLACK_HIGH = np.array([180, 255, 50], dtype=np.uint8)
+_BROWN_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+_BLACK_KERNEL = np.ones((3, 3), np.uint8)
+
+# Rows of the before/after comparison table, in display order
+_COMPARISON_METRICS = ("Fruit Type", "Condition", "Freshness", "Confidence", "Safety", "Ripeness", "Defects")
+
 # Set CustomTkinter appearance
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("green")
 
+@lru_cache(maxsize=None)
+def _font(**options):
+    """Shared CTkFont per distinct set of options (created on first use, after the root exists)"""
+    return ctk.CTkFont(**options)
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _local_pixel_stats(hsv, lab, gray, brown_mask, black_mask):
+        """Single pass over HSV/LAB/gray: brown and black masks plus LAB/saturation sums"""
+        height, width = hsv.shape[0], hsv.shape[1]
+        
+        # Per-row accumulators, summed once at the end
+        rows = np.zeros((height, 7), dtype=np.float64)
+        for i in prange(height):
+            sum_l = 0
+            sum_l2 = 0
+            sum_a = 0
+            sum_a2 = 0
+            sum_b = 0
+            sum_b2 = 0
+            sum_s = 0
+            for j in range(width):
+                h = hsv[i, j, 0]
+                s = hsv[i, j, 1]
+                v = hsv[i, j, 2]
+                
+                # Same ranges as detect_brown_rot / detect_black_spots
+                brown_mask[i, j] = 255 if 8 <= h <= 20 and s >= 50 and 20 <= v <= 200 else 0
+                black_mask[i, j] = 255 if v <= 50 and gray[i, j] <= 30 else 0
+                
+                l = np.int64(lab[i, j, 0])
+                a = np.int64(lab[i, j, 1])
+                b = np.int64(lab[i, j, 2])
+                sum_l += l
+                sum_l2 += l * l
+                sum_a += a
+                sum_a2 += a * a
+                sum_b += b
+                sum_b2 += b * b
+                sum_s += s
+            rows[i, 0] = sum_l
+            rows[i, 1] = sum_l2
+            rows[i, 2] = sum_a
+            rows[i, 3] = sum_a2
+            rows[i, 4] = sum_b
+            rows[i, 5] = sum_b2
+            rows[i, 6] = sum_s
+        
+        totals = rows.sum(axis=0)
+        return (totals[0], totals[1], totals[2], totals[3],
+                totals[4], totals[5], totals[6])
+    
+    @njit(parallel=True, cache=True)
+    def _start_thread_pool(out):
+        """Tiny parallel kernel, run once on the main thread"""
+        for i in prange(out.shape[0]):
+            out[i] = i
+else:
+    _local_pixel_stats = None
+
 @dataclass
 class FruitAnalysisResult:
     """Data class for fruit analysis results"""
@@ -38,7 +131,9 @@ class FruitAnalysisResult:
     local_metrics: Dict
     ai_analysis: Optional[Dict] = None
     timestamp: datetime = None
-    image: Optional[np.ndarray] = None
+    # Small BGR preview; the full image is decoded from image_bytes on demand
+    thumbnail: Optional[np.ndarray] = None
+    image_bytes: Optional[bytes] = None
     detailed_analysis: str = ""
     key_observations: List[str] = None
     treatment_options: List[str] = None
@@ -52,6 +147,38 @@ class AdvancedFruitAnalyzerUI:
             'X-goog-api-key': self.API_KEY
         }
         
+        # Pooled HTTP session so Gemini calls reuse the TCP/TLS connection
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._session.mount('https://', adapter)
+        
+        # numba's thread pool must be started from the main thread: with the
+        # TBB layer a first parallel launch from a worker hangs the exit
+        if njit is not None:
+            _start_thread_pool(np.empty(2, dtype=np.int64))
+        
+        # Shared worker pool for analysis and Gemini requests
+        self._pool = ThreadPoolExecutor(max_workers=4)
+        # Set by on_closing; workers finishing later drop their UI callbacks
+        self._closing = False
+        
+        # Gemini results keyed by image fingerprint (LRU, see analyze_with_gemini)
+        self._ai_cache = OrderedDict()
+        self._ai_cache_size = 64
+        self._ai_cache_lock = threading.Lock()
+        
+        # Base64 upload payloads keyed by the image array they were made from,
+        # so retrying a failed request doesn't re-encode (see encode_image_base64)
+        self._b64_cache = OrderedDict()
+        self._b64_cache_size = 8
+        self._b64_cache_lock = threading.Lock()
+        
+        # Downscaled analysis copies, kept per source array so a retry hands the
+        # same array to the base64 cache (see analysis_image)
+        self._analysis_images = OrderedDict()
+        self._analysis_images_size = 4
+        self._analysis_images_lock = threading.Lock()
+        
         # Initialize root window
         self.root = ctk.CTk()
         self.root.title("🍎 Fruit Health Inspector Pro - Advanced Analysis System")
@@ -60,10 +187,18 @@ class AdvancedFruitAnalyzerUI:
         
         # Initialize variables
         self.current_image_cv2 = None
+        # Encoded file bytes of the current image, when it came from a file or URL
+        self.current_image_bytes = None
         self.current_result = None
+        # Comparison images are stored already shrunk to the analysis size
         self.comparison_images = {'before': None, 'after': None}
+        # Original file bytes of small enough JPEG comparison images, uploaded to Gemini as-is
+        self.comparison_raw_bytes = {'before': None, 'after': None}
         self.comparison_results = {'before': None, 'after': None}
         self.analysis_history = []
+        # History thumbnails by analysis_history index, kept across visits to the
+        # History view (Tk drops images nobody references)
+        self._history_photos = {}
         self.camera_active = False
         
         # Initialize UI
@@ -88,6 +223,9 @@ class AdvancedFruitAnalyzerUI:
         self.main_container = ctk.CTkFrame(self.root, fg_color="#0a0a0a")
         self.main_container.pack(fill="both", expand=True)
         
+        # ttk styles (history Treeview), configured once
+        self.setup_ttk_styles()
+        
         # Create header
         self.create_header()
         
@@ -107,9 +245,35 @@ class AdvancedFruitAnalyzerUI:
         # Setup sidebar
         self.setup_sidebar()
         
+        # One notification toast, reused by every show_notification call
+        self.create_notification_toast()
+        
         # Setup initial view
         self.show_analysis_view()
         
+    def setup_ttk_styles(self):
+        """Configure the ttk theme and the named styles used by the history view"""
+        style = ttk.Style()
+        # ttk theme is app-wide, so it is set once here rather than per history view
+        style.theme_use("clam")
+        style.configure(
+            "History.Treeview",
+            background="#333333",
+            fieldbackground="#2a2a2a",
+            foreground="#cccccc",
+            bordercolor="#2a2a2a",
+            rowheight=90,
+            font=("Arial", 12)
+        )
+        style.configure(
+            "History.Treeview.Heading",
+            background="#1a1a1a",
+            foreground="#ffffff",
+            relief="flat",
+            font=("Arial", 12, "bold")
+        )
+        style.map("History.Treeview", background=[("selected", "#2196F3")])
+        
     def create_header(self):
         """Create application header"""
         header = ctk.CTkFrame(self.main_container, fg_color="#0f0f0f", height=80)
@@ -123,7 +287,7 @@ class AdvancedFruitAnalyzerUI:
         title = ctk.CTkLabel(
             title_frame,
             text="🍎 Fruit Health Inspector Pro",
-            font=ctk.CTkFont(family="Arial Black", size=28, weight="bold"),
+            font=_font(family="Arial Black", size=28, weight="bold"),
             text_color="#ffffff"
         )
         title.pack(anchor="w")
@@ -131,7 +295,7 @@ class AdvancedFruitAnalyzerUI:
         subtitle = ctk.CTkLabel(
             title_frame,
             text="AI-Powered Quality Analysis & Disease Detection System",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#888888"
         )
         subtitle.pack(anchor="w")
@@ -143,15 +307,16 @@ class AdvancedFruitAnalyzerUI:
         self.status_label = ctk.CTkLabel(
             status_frame,
             text="● System Ready",
-            font=ctk.CTkFont(size=12),
+            font=_font(size=12),
             text_color="#4CAF50"
         )
         self.status_label.pack()
         
+        self._last_time_str = datetime.now().strftime("%B %d, %Y | %I:%M %p")
         self.time_label = ctk.CTkLabel(
             status_frame,
-            text=datetime.now().strftime("%B %d, %Y | %I:%M %p"),
-            font=ctk.CTkFont(size=11),
+            text=self._last_time_str,
+            font=_font(size=11),
             text_color="#666666"
         )
         self.time_label.pack()
@@ -160,10 +325,16 @@ class AdvancedFruitAnalyzerUI:
         self.update_time()
         
     def update_time(self):
-        """Update time display"""
+        """Update time display (it shows minutes, so wake up once per minute)"""
         if hasattr(self, 'time_label') and self.time_label.winfo_exists():
-            self.time_label.configure(text=datetime.now().strftime("%B %d, %Y | %I:%M %p"))
-            self.root.after(1000, self.update_time)
+            now = datetime.now()
+            time_str = now.strftime("%B %d, %Y | %I:%M %p")
+            if time_str != self._last_time_str:
+                self.time_label.configure(text=time_str)
+                self._last_time_str = time_str
+            # Next call lands just after the next minute boundary
+            ms_to_next_minute = (60 - now.second) * 1000 - now.microsecond // 1000
+            self.root.after(ms_to_next_minute + 50, self.update_time)
             
     def setup_sidebar(self):
         """Setup sidebar navigation"""
@@ -171,7 +342,7 @@ class AdvancedFruitAnalyzerUI:
         sidebar_header = ctk.CTkLabel(
             self.sidebar,
             text="Navigation",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             text_color="#ffffff"
         )
         sidebar_header.pack(pady=(20, 10))
@@ -192,7 +363,7 @@ class AdvancedFruitAnalyzerUI:
                 self.sidebar,
                 text=text,
                 command=command,
-                font=ctk.CTkFont(size=14, weight="bold"),
+                font=_font(size=14, weight="bold"),
                 height=45,
                 corner_radius=10,
                 fg_color="#2a2a2a",
@@ -210,7 +381,7 @@ class AdvancedFruitAnalyzerUI:
         quick_label = ctk.CTkLabel(
             self.sidebar,
             text="Quick Actions",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=_font(size=14, weight="bold"),
             text_color="#cccccc"
         )
         quick_label.pack(pady=(0, 10))
@@ -227,7 +398,7 @@ class AdvancedFruitAnalyzerUI:
                 self.sidebar,
                 text=text,
                 command=command,
-                font=ctk.CTkFont(size=12),
+                font=_font(size=12),
                 height=35,
                 corner_radius=8,
                 fg_color=color,
@@ -242,7 +413,7 @@ class AdvancedFruitAnalyzerUI:
         info_label = ctk.CTkLabel(
             info_frame,
             text="💡 Tip: Use good lighting\nfor accurate analysis",
-            font=ctk.CTkFont(size=11),
+            font=_font(size=11),
             text_color="#888888",
             justify="left"
         )
@@ -277,7 +448,7 @@ class AdvancedFruitAnalyzerUI:
         self.image_label = ctk.CTkLabel(
             self.image_frame,
             text="📷 No Image Loaded\n\nClick buttons below to load an image",
-            font=ctk.CTkFont(size=16),
+            font=_font(size=16),
             text_color="#666666"
         )
         self.image_label.pack(fill="both", expand=True)
@@ -298,7 +469,7 @@ class AdvancedFruitAnalyzerUI:
                 controls_frame,
                 text=text,
                 command=command,
-                font=ctk.CTkFont(size=12, weight="bold"),
+                font=_font(size=12, weight="bold"),
                 height=35,
                 corner_radius=8,
                 fg_color=color,
@@ -315,7 +486,7 @@ class AdvancedFruitAnalyzerUI:
         info_title = ctk.CTkLabel(
             info_section,
             text="📊 Quick Overview",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             text_color="#ffffff"
         )
         info_title.pack(pady=(15, 10))
@@ -327,7 +498,7 @@ class AdvancedFruitAnalyzerUI:
         self.no_info_label = ctk.CTkLabel(
             self.quick_info_frame,
             text="Load an image and click\n'Analyze' to see results",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         self.no_info_label.pack(expand=True)
@@ -337,7 +508,7 @@ class AdvancedFruitAnalyzerUI:
             info_section,
             text="🔬 ANALYZE FRUIT",
             command=self.analyze_current_image,
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             height=60,
             corner_radius=30,
             fg_color="#FF5722",
@@ -353,7 +524,7 @@ class AdvancedFruitAnalyzerUI:
         results_title = ctk.CTkLabel(
             results_frame,
             text="📋 Detailed Analysis Results",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             text_color="#ffffff"
         )
         results_title.pack(pady=(15, 10))
@@ -369,12 +540,34 @@ class AdvancedFruitAnalyzerUI:
         self.results_notebook.add("💡 Recommendations")
         self.results_notebook.add("📈 Technical Data")
         
-        # Initialize tab contents
-        self.init_condition_tab()
-        self.init_health_tab()
-        self.init_metrics_tab()
-        self.init_recommendations_tab()
-        self.init_technical_tab()
+        # Tab contents are built, and filled with the latest result, the first
+        # time each tab is shown
+        self._tab_builders = {
+            "🎯 Condition": (self.init_condition_tab, self.display_condition_details),
+            "🦠 Health Status": (self.init_health_tab, self.display_health_details),
+            "📊 Metrics": (self.init_metrics_tab, self.display_metrics_details),
+            "💡 Recommendations": (self.init_recommendations_tab, self.display_recommendations),
+            "📈 Technical Data": (self.init_technical_tab, self.display_technical_data)
+        }
+        self._tab_initialized = {name: False for name in self._tab_builders}
+        self._tab_pending = {}
+        self.results_notebook.configure(command=self.on_results_tab_changed)
+        self.refresh_result_tab(self.results_notebook.get())
+        
+    def on_results_tab_changed(self):
+        """Build or refresh the tab the user just switched to"""
+        self.refresh_result_tab(self.results_notebook.get())
+        
+    def refresh_result_tab(self, name):
+        """Build a result tab on first use and render any result it hasn't shown yet"""
+        init_tab, display_tab = self._tab_builders[name]
+        if not self._tab_initialized[name]:
+            init_tab()
+            self._tab_initialized[name] = True
+            
+        result = self._tab_pending.pop(name, None)
+        if result is not None:
+            display_tab(result)
         
     def init_condition_tab(self):
         """Initialize condition tab"""
@@ -386,7 +579,7 @@ class AdvancedFruitAnalyzerUI:
         placeholder = ctk.CTkLabel(
             self.condition_content,
             text="Fruit condition analysis will appear here",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         placeholder.pack(pady=50)
@@ -400,7 +593,7 @@ class AdvancedFruitAnalyzerUI:
         placeholder = ctk.CTkLabel(
             self.health_content,
             text="Disease and infection analysis will appear here",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         placeholder.pack(pady=50)
@@ -414,7 +607,7 @@ class AdvancedFruitAnalyzerUI:
         placeholder = ctk.CTkLabel(
             self.metrics_content,
             text="Quality metrics and scores will appear here",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         placeholder.pack(pady=50)
@@ -428,7 +621,7 @@ class AdvancedFruitAnalyzerUI:
         placeholder = ctk.CTkLabel(
             self.recommendations_content,
             text="Prevention tips and recommendations will appear here",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         placeholder.pack(pady=50)
@@ -442,7 +635,7 @@ class AdvancedFruitAnalyzerUI:
         placeholder = ctk.CTkLabel(
             self.technical_content,
             text="Technical analysis data will appear here",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         placeholder.pack(pady=50)
@@ -460,7 +653,7 @@ class AdvancedFruitAnalyzerUI:
         title = ctk.CTkLabel(
             comparison_container,
             text="📊 Fruit Comparison Analysis",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=_font(size=24, weight="bold"),
             text_color="#ffffff"
         )
         title.pack(pady=(10, 20))
@@ -476,7 +669,7 @@ class AdvancedFruitAnalyzerUI:
         before_title = ctk.CTkLabel(
             before_frame,
             text="📸 Before / First Fruit",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#4CAF50"
         )
         before_title.pack(pady=(15, 10))
@@ -489,7 +682,7 @@ class AdvancedFruitAnalyzerUI:
         self.before_image_label = ctk.CTkLabel(
             self.before_image_frame,
             text="No image loaded\n\nClick 'Load Image' below",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         self.before_image_label.pack(expand=True)
@@ -502,7 +695,7 @@ class AdvancedFruitAnalyzerUI:
             before_btn_frame,
             text="📁 Load Image",
             command=lambda: self.load_comparison_image('before'),
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=_font(size=12, weight="bold"),
             height=35,
             fg_color="#4CAF50",
             corner_radius=8
@@ -513,7 +706,7 @@ class AdvancedFruitAnalyzerUI:
             before_btn_frame,
             text="🔬 Analyze",
             command=lambda: self.analyze_comparison_image('before'),
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=_font(size=12, weight="bold"),
             height=35,
             fg_color="#2196F3",
             corner_radius=8
@@ -524,13 +717,16 @@ class AdvancedFruitAnalyzerUI:
         self.before_results_frame = ctk.CTkFrame(before_frame, fg_color="#333333", corner_radius=10)
         self.before_results_frame.pack(fill="x", padx=15, pady=(0, 15))
         
-        before_results_placeholder = ctk.CTkLabel(
-            self.before_results_frame,
-            text="Results will appear here",
-            font=ctk.CTkFont(size=12),
-            text_color="#888888"
-        )
-        before_results_placeholder.pack(pady=20)
+        # One Tk image per slot, refilled in place on every load
+        self.comparison_photos = {
+            'before': ImageTk.PhotoImage(Image.new('RGB', (280, 200))),
+            'after': ImageTk.PhotoImage(Image.new('RGB', (280, 200)))
+        }
+        
+        # Result labels are built once per view and reconfigured for each result
+        self.comparison_labels = {
+            'before': self.create_comparison_result_labels(self.before_results_frame)
+        }
         
         # After section
         after_frame = ctk.CTkFrame(images_frame, fg_color="#2a2a2a", corner_radius=15)
@@ -539,7 +735,7 @@ class AdvancedFruitAnalyzerUI:
         after_title = ctk.CTkLabel(
             after_frame,
             text="📸 After / Second Fruit",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#FF9800"
         )
         after_title.pack(pady=(15, 10))
@@ -552,7 +748,7 @@ class AdvancedFruitAnalyzerUI:
         self.after_image_label = ctk.CTkLabel(
             self.after_image_frame,
             text="No image loaded\n\nClick 'Load Image' below",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         self.after_image_label.pack(expand=True)
@@ -565,7 +761,7 @@ class AdvancedFruitAnalyzerUI:
             after_btn_frame,
             text="📁 Load Image",
             command=lambda: self.load_comparison_image('after'),
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=_font(size=12, weight="bold"),
             height=35,
             fg_color="#FF9800",
             corner_radius=8
@@ -576,7 +772,7 @@ class AdvancedFruitAnalyzerUI:
             after_btn_frame,
             text="🔬 Analyze",
             command=lambda: self.analyze_comparison_image('after'),
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=_font(size=12, weight="bold"),
             height=35,
             fg_color="#2196F3",
             corner_radius=8
@@ -586,14 +782,7 @@ class AdvancedFruitAnalyzerUI:
         # After results
         self.after_results_frame = ctk.CTkFrame(after_frame, fg_color="#333333", corner_radius=10)
         self.after_results_frame.pack(fill="x", padx=15, pady=(0, 15))
-        
-        after_results_placeholder = ctk.CTkLabel(
-            self.after_results_frame,
-            text="Results will appear here",
-            font=ctk.CTkFont(size=12),
-            text_color="#888888"
-        )
-        after_results_placeholder.pack(pady=20)
+        self.comparison_labels['after'] = self.create_comparison_result_labels(self.after_results_frame)
         
         # Comparison results section
         comparison_results_frame = ctk.CTkFrame(comparison_container, fg_color="#2a2a2a", corner_radius=15)
@@ -602,7 +791,7 @@ class AdvancedFruitAnalyzerUI:
         comparison_title = ctk.CTkLabel(
             comparison_results_frame,
             text="📊 Comparison Summary",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             text_color="#ffffff"
         )
         comparison_title.pack(pady=(15, 10))
@@ -612,7 +801,7 @@ class AdvancedFruitAnalyzerUI:
             comparison_results_frame,
             text="🔄 COMPARE FRUITS",
             command=self.perform_comparison,
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             height=50,
             corner_radius=25,
             fg_color="#9C27B0",
@@ -628,11 +817,38 @@ class AdvancedFruitAnalyzerUI:
         comparison_placeholder = ctk.CTkLabel(
             self.comparison_results_display,
             text="Load and analyze both images to see comparison",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#888888"
         )
         comparison_placeholder.pack(pady=30)
         
+        # Built by the first comparison in this view (see create_comparison_report)
+        self.comparison_report = None
+        
+    def create_comparison_result_labels(self, results_frame):
+        """Status line and result labels of one comparison side, packed as needed"""
+        metric_font = _font(size=11)
+        labels = {
+            'status': ctk.CTkLabel(results_frame, text="Results will appear here",
+                                   font=_font(size=12), text_color="#888888"),
+            'condition': ctk.CTkLabel(results_frame, text="",
+                                      font=_font(size=14, weight="bold"))
+        }
+        for name in ('type', 'confidence', 'freshness', 'safety'):
+            labels[name] = ctk.CTkLabel(results_frame, text="", font=metric_font, text_color="#cccccc")
+        labels['defects'] = ctk.CTkLabel(results_frame, text="", font=metric_font, text_color="#ff9800")
+        
+        labels['status'].pack(pady=20)
+        return labels
+        
+    def show_comparison_status(self, position, text, color):
+        """Replace one comparison side's results with a single status line"""
+        labels = self.comparison_labels[position]
+        for label in labels.values():
+            label.pack_forget()
+        labels['status'].configure(text=text, text_color=color)
+        labels['status'].pack(pady=20)
+        
     def load_comparison_image(self, position):
         """Load image for comparison"""
         file_path = filedialog.askopenfilename(
@@ -645,29 +861,36 @@ class AdvancedFruitAnalyzerUI:
         
         if file_path:
             try:
-                # Load image
-                image = cv2.imread(file_path)
+                # Load image, keeping the file bytes for the Gemini upload
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+                image = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
                 if image is not None:
-                    self.comparison_images[position] = image
-                    
-                    # Display image
-                    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(image_rgb)
+                    # Only the analysis-sized copy is kept; the thumbnail below is cut from it
+                    analysis = self.shrink_to_fit(image, _MAX_ANALYSIS_EDGE, _MAX_ANALYSIS_EDGE)
+                    self.comparison_images[position] = analysis
+                    # The file itself is only uploaded when it didn't need shrinking
+                    is_jpeg = raw.startswith(b'\xff\xd8\xff')
+                    self.comparison_raw_bytes[position] = raw if is_jpeg and analysis is image else None
                     
-                    # Resize for display
-                    display_size = (280, 200)
-                    pil_image.thumbnail(display_size, Image.Resampling.LANCZOS)
+                    # Resize for display and convert straight into the centre of the
+                    # slot's black background
+                    display = self.shrink_to_fit(analysis, 280, 200)
+                    canvas = np.zeros((200, 280, 3), dtype=np.uint8)
+                    top = (200 - display.shape[0]) // 2
+                    left = (280 - display.shape[1]) // 2
+                    cv2.cvtColor(display, cv2.COLOR_BGR2RGB,
+                                 dst=canvas[top:top + display.shape[0], left:left + display.shape[1]])
                     
-                    # Convert to PhotoImage
-                    photo = ImageTk.PhotoImage(pil_image)
+                    # Refill the slot's existing PhotoImage instead of allocating a new one
+                    photo = self.comparison_photos[position]
+                    photo.paste(Image.fromarray(canvas))
                     
                     # Update appropriate label
                     if position == 'before':
                         self.before_image_label.configure(image=photo, text="")
-                        self.before_image_label.image = photo
                     else:
                         self.after_image_label.configure(image=photo, text="")
-                        self.after_image_label.image = photo
                     
                     self.show_notification(f"✅ {position.capitalize()} image loaded", "success")
                     self.check_comparison_ready()
@@ -676,97 +899,74 @@ class AdvancedFruitAnalyzerUI:
             except Exception as e:
                 self.show_notification(f"❌ Error: {str(e)}", "error")
                 
+    def shrink_to_fit(self, image, max_width, max_height):
+        """Shrink an image to fit the box, never enlarging it"""
+        height, width = image.shape[:2]
+        scale = min(max_width / width, max_height / height)
+        if scale < 1:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return image
+        
+    def fit_for_display(self, image, max_width, max_height):
+        """Shrink a BGR image to fit the box (never enlarging) and return it as RGB"""
+        return cv2.cvtColor(self.shrink_to_fit(image, max_width, max_height), cv2.COLOR_BGR2RGB)
+        
     def analyze_comparison_image(self, position):
         """Analyze comparison image"""
         if self.comparison_images[position] is None:
             self.show_notification(f"⚠️ No {position} image loaded", "warning")
             return
             
-        # Show progress
-        if position == 'before':
-            results_frame = self.before_results_frame
-        else:
-            results_frame = self.after_results_frame
-            
-        # Clear previous results
-        for widget in results_frame.winfo_children():
-            widget.destroy()
-            
-        # Show loading
-        loading_label = ctk.CTkLabel(
-            results_frame,
-            text="🔄 Analyzing...",
-            font=ctk.CTkFont(size=12),
-            text_color="#4CAF50"
-        )
-        loading_label.pack(pady=20)
+        # Show loading in place of the previous results
+        self.show_comparison_status(position, "🔄 Analyzing...", "#4CAF50")
         
-        # Perform analysis in thread
-        def analyze_thread():
-            try:
-                # Analyze image
-                result = self.perform_fruit_analysis(self.comparison_images[position])
-                self.comparison_results[position] = result
-                
-                # Update UI
-                self.root.after(0, lambda: self.display_comparison_result(position, result))
-                self.root.after(0, self.check_comparison_ready)
-                
-            except Exception as e:
-                self.root.after(0, lambda: self.show_notification(f"❌ Analysis failed: {str(e)}", "error"))
-                
-        thread = threading.Thread(target=analyze_thread, daemon=True)
-        thread.start()
+        # Perform analysis on the worker pool, hand the result back to the Tk thread
+        future = self._pool.submit(self.perform_fruit_analysis, self.comparison_images[position],
+                                   self.comparison_raw_bytes[position])
+        future.add_done_callback(
+            lambda f: self.post_to_ui(self.on_comparison_analyzed, position, f))
+        
+    def on_comparison_analyzed(self, position, future):
+        """Show a finished comparison analysis (runs on the Tk thread)"""
+        try:
+            result = future.result()
+        except Exception as e:
+            self.show_notification(f"❌ Analysis failed: {str(e)}", "error")
+            return
+        
+        self.comparison_results[position] = result
+        self.display_comparison_result(position, result)
+        self.check_comparison_ready()
         
     def display_comparison_result(self, position, result):
         """Display comparison analysis result"""
-        if position == 'before':
-            results_frame = self.before_results_frame
-        else:
-            results_frame = self.after_results_frame
-            
-        # Clear frame
-        for widget in results_frame.winfo_children():
-            widget.destroy()
+        labels = self.comparison_labels[position]
+        for label in labels.values():
+            label.pack_forget()
             
         # Display results
         # Condition
         condition_color = self.get_condition_color(result.condition)
-        condition_label = ctk.CTkLabel(
-            results_frame,
-            text=result.condition.split(' - ')[0],
-            font=ctk.CTkFont(size=14, weight="bold"),
-            text_color=condition_color
-        )
-        condition_label.pack(pady=(15, 5))
+        labels['condition'].configure(text=result.condition.split(' - ')[0], text_color=condition_color)
+        labels['condition'].pack(pady=(15, 5))
         
         # Metrics
         metrics = [
-            (f"🍎 Type: {result.fruit_type}"),
-            (f"💯 Confidence: {result.confidence:.0f}%"),
-            (f"🌟 Freshness: {result.freshness_score:.0f}%"),
-            (f"🏥 Safety: {result.safety}")
+            ('type', f"🍎 Type: {result.fruit_type}"),
+            ('confidence', f"💯 Confidence: {result.confidence:.0f}%"),
+            ('freshness', f"🌟 Freshness: {result.freshness_score:.0f}%"),
+            ('safety', f"🏥 Safety: {result.safety}")
         ]
         
-        for metric in metrics:
-            metric_label = ctk.CTkLabel(
-                results_frame,
-                text=metric,
-                font=ctk.CTkFont(size=11),
-                text_color="#cccccc"
-            )
-            metric_label.pack(pady=2)
+        for name, metric in metrics:
+            labels[name].configure(text=metric)
+            labels[name].pack(pady=2)
             
-        # Defects
+        # Defects (left unpacked when there are none)
         if result.defects:
-            defect_text = f"⚠️ Issues: {len(result.defects)} found"
-            defect_label = ctk.CTkLabel(
-                results_frame,
-                text=defect_text,
-                font=ctk.CTkFont(size=11),
-                text_color="#ff9800"
-            )
-            defect_label.pack(pady=2)
+            labels['defects'].configure(text=f"⚠️ Issues: {len(result.defects)} found")
+            labels['defects'].pack(pady=2)
             
     def check_comparison_ready(self):
         """Check if both images are analyzed and ready for comparison"""
@@ -781,30 +981,16 @@ class AdvancedFruitAnalyzerUI:
             self.show_notification("⚠️ Please analyze both images first", "warning")
             return
             
-        # Clear comparison display
-        for widget in self.comparison_results_display.winfo_children():
-            widget.destroy()
-            
+        # The report widgets are built by the first comparison and only updated after that
+        if self.comparison_report is None:
+            for widget in self.comparison_results_display.winfo_children():
+                widget.destroy()
+            self.comparison_report = self.create_comparison_report()
+        report = self.comparison_report
+        
         before = self.comparison_results['before']
         after = self.comparison_results['after']
         
-        # Create comparison report
-        comparison_frame = ctk.CTkScrollableFrame(self.comparison_results_display, fg_color="#333333")
-        comparison_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Title
-        title = ctk.CTkLabel(
-            comparison_frame,
-            text="📊 Detailed Comparison Analysis",
-            font=ctk.CTkFont(size=18, weight="bold"),
-            text_color="#ffffff"
-        )
-        title.pack(pady=(0, 15))
-        
-        # Overall change
-        overall_frame = ctk.CTkFrame(comparison_frame, fg_color="#444444", corner_radius=10)
-        overall_frame.pack(fill="x", pady=10)
-        
         # Determine overall change
         freshness_change = after.freshness_score - before.freshness_score
         if freshness_change > 10:
@@ -817,68 +1003,25 @@ class AdvancedFruitAnalyzerUI:
             change_text = "➡️ SIMILAR"
             change_color = "#FF9800"
             
-        overall_label = ctk.CTkLabel(
-            overall_frame,
-            text=f"Overall Status: {change_text}",
-            font=ctk.CTkFont(size=16, weight="bold"),
-            text_color=change_color
-        )
-        overall_label.pack(pady=15)
+        report['overall'].configure(text=f"Overall Status: {change_text}", text_color=change_color)
         
         # Detailed metrics comparison
-        metrics_data = [
-            ("Fruit Type", before.fruit_type, after.fruit_type),
-            ("Condition", before.condition.split(' - ')[0], after.condition.split(' - ')[0]),
-            ("Freshness", f"{before.freshness_score:.0f}%", f"{after.freshness_score:.0f}%"),
-            ("Confidence", f"{before.confidence:.0f}%", f"{after.confidence:.0f}%"),
-            ("Safety", before.safety, after.safety),
-            ("Ripeness", before.ripeness, after.ripeness),
-            ("Defects", len(before.defects), len(after.defects))
-        ]
-        
-        # Create comparison table
-        table_frame = ctk.CTkFrame(comparison_frame, fg_color="#444444", corner_radius=10)
-        table_frame.pack(fill="x", pady=10)
+        metrics_data = {
+            "Fruit Type": (before.fruit_type, after.fruit_type),
+            "Condition": (before.condition.split(' - ')[0], after.condition.split(' - ')[0]),
+            "Freshness": (f"{before.freshness_score:.0f}%", f"{after.freshness_score:.0f}%"),
+            "Confidence": (f"{before.confidence:.0f}%", f"{after.confidence:.0f}%"),
+            "Safety": (before.safety, after.safety),
+            "Ripeness": (before.ripeness, after.ripeness),
+            "Defects": (len(before.defects), len(after.defects))
+        }
         
-        # Table header
-        headers = ["Metric", "Before", "After", "Change"]
-        for i, header in enumerate(headers):
-            header_label = ctk.CTkLabel(
-                table_frame,
-                text=header,
-                font=ctk.CTkFont(size=13, weight="bold"),
-                text_color="#ffffff"
-            )
-            header_label.grid(row=0, column=i, padx=15, pady=10, sticky="w")
-            
-        # Table rows
-        for i, (metric, before_val, after_val) in enumerate(metrics_data, 1):
-            # Metric name
-            metric_label = ctk.CTkLabel(
-                table_frame,
-                text=metric,
-                font=ctk.CTkFont(size=12),
-                text_color="#cccccc"
-            )
-            metric_label.grid(row=i, column=0, padx=15, pady=5, sticky="w")
-            
-            # Before value
-            before_label = ctk.CTkLabel(
-                table_frame,
-                text=str(before_val),
-                font=ctk.CTkFont(size=12),
-                text_color="#888888"
-            )
-            before_label.grid(row=i, column=1, padx=15, pady=5, sticky="w")
-            
-            # After value
-            after_label = ctk.CTkLabel(
-                table_frame,
-                text=str(after_val),
-                font=ctk.CTkFont(size=12),
-                text_color="#888888"
-            )
-            after_label.grid(row=i, column=2, padx=15, pady=5, sticky="w")
+        # Table rows, one per entry of _COMPARISON_METRICS
+        for row, metric in zip(report['rows'], _COMPARISON_METRICS):
+            before_val, after_val = metrics_data[metric]
+            _, before_label, after_label, change_label = row
+            before_label.configure(text=str(before_val))
+            after_label.configure(text=str(after_val))
             
             # Change indicator
             if before_val != after_val:
@@ -897,43 +1040,96 @@ class AdvancedFruitAnalyzerUI:
                 change_text = "Same"
                 change_color = "#888888"
                 
-            change_label = ctk.CTkLabel(
+            change_label.configure(text=change_text, text_color=change_color)
+            
+        # Generate insights, growing the label pool only when there are more than ever before
+        insights = self.generate_comparison_insights(before, after)
+        pool = report['insights']
+        while len(pool) < len(insights):
+            pool.append(ctk.CTkLabel(
+                report['rec_frame'],
+                text="",
+                font=_font(size=12),
+                text_color="#cccccc",
+                wraplength=600,
+                anchor="w",
+                justify="left"
+            ))
+            
+        for insight_label in pool:
+            insight_label.pack_forget()
+        for insight_label, insight in zip(pool, insights):
+            insight_label.configure(text=f"• {insight}")
+            insight_label.pack(anchor="w", padx=20, pady=3)
+        
+        self.show_notification("✅ Comparison completed", "success")
+        
+    def create_comparison_report(self):
+        """Comparison report widgets: overall status, metrics table and insights frame"""
+        comparison_frame = ctk.CTkScrollableFrame(self.comparison_results_display, fg_color="#333333")
+        comparison_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Title
+        title = ctk.CTkLabel(
+            comparison_frame,
+            text="📊 Detailed Comparison Analysis",
+            font=_font(size=18, weight="bold"),
+            text_color="#ffffff"
+        )
+        title.pack(pady=(0, 15))
+        
+        # Overall change
+        overall_frame = ctk.CTkFrame(comparison_frame, fg_color="#444444", corner_radius=10)
+        overall_frame.pack(fill="x", pady=10)
+        
+        overall_label = ctk.CTkLabel(
+            overall_frame,
+            text="",
+            font=_font(size=16, weight="bold")
+        )
+        overall_label.pack(pady=15)
+        
+        # Create comparison table
+        table_frame = ctk.CTkFrame(comparison_frame, fg_color="#444444", corner_radius=10)
+        table_frame.pack(fill="x", pady=10)
+        
+        # Table header
+        headers = ["Metric", "Before", "After", "Change"]
+        for i, header in enumerate(headers):
+            header_label = ctk.CTkLabel(
                 table_frame,
-                text=change_text,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                text_color=change_color
+                text=header,
+                font=_font(size=13, weight="bold"),
+                text_color="#ffffff"
+            )
+            header_label.grid(row=0, column=i, padx=15, pady=10, sticky="w")
+            
+        # One row of metric / before / after / change cells per compared metric
+        rows = []
+        for i, metric in enumerate(_COMPARISON_METRICS, start=1):
+            row = (
+                ctk.CTkLabel(table_frame, text=metric, font=_font(size=12), text_color="#cccccc"),
+                ctk.CTkLabel(table_frame, text="", font=_font(size=12), text_color="#888888"),
+                ctk.CTkLabel(table_frame, text="", font=_font(size=12), text_color="#888888"),
+                ctk.CTkLabel(table_frame, text="", font=_font(size=12, weight="bold"))
             )
-            change_label.grid(row=i, column=3, padx=15, pady=5, sticky="w")
+            for column, label in enumerate(row):
+                label.grid(row=i, column=column, padx=15, pady=5, sticky="w")
+            rows.append(row)
             
         # Recommendations based on comparison
         rec_frame = ctk.CTkFrame(comparison_frame, fg_color="#444444", corner_radius=10)
-        rec_frame.pack(fill="x", pady=10)
+        rec_frame.pack(fill="x", pady=(0, 10))
         
         rec_title = ctk.CTkLabel(
             rec_frame,
             text="💡 Comparison Insights",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=_font(size=14, weight="bold"),
             text_color="#ffffff"
         )
         rec_title.pack(pady=(10, 5))
         
-        # Generate insights
-        insights = self.generate_comparison_insights(before, after)
-        for insight in insights:
-            insight_label = ctk.CTkLabel(
-                rec_frame,
-                text=f"• {insight}",
-                font=ctk.CTkFont(size=12),
-                text_color="#cccccc",
-                wraplength=600,
-                anchor="w",
-                justify="left"
-            )
-            insight_label.pack(anchor="w", padx=20, pady=3)
-            
-        rec_frame.pack(pady=(0, 10))
-        
-        self.show_notification("✅ Comparison completed", "success")
+        return {'overall': overall_label, 'rows': rows, 'rec_frame': rec_frame, 'insights': []}
         
     def generate_comparison_insights(self, before, after):
         """Generate insights from comparison"""
@@ -978,107 +1174,153 @@ class AdvancedFruitAnalyzerUI:
         title = ctk.CTkLabel(
             history_container,
             text="📈 Analysis History",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=_font(size=24, weight="bold"),
             text_color="#ffffff"
         )
         title.pack(pady=(10, 20))
         
-        # History list
-        history_scroll = ctk.CTkScrollableFrame(history_container, fg_color="#2a2a2a", corner_radius=15)
-        history_scroll.pack(fill="both", expand=True, padx=20)
+        history_frame = ctk.CTkFrame(history_container, fg_color="#2a2a2a", corner_radius=15)
+        history_frame.pack(fill="both", expand=True, padx=20)
         
         if not self.analysis_history:
             no_history = ctk.CTkLabel(
-                history_scroll,
+                history_frame,
                 text="No analysis history yet\n\nYour previous analyses will appear here",
-                font=ctk.CTkFont(size=16),
+                font=_font(size=16),
                 text_color="#666666"
             )
             no_history.pack(pady=100)
-        else:
-            # Display history entries
-            for i, result in enumerate(reversed(self.analysis_history[-20:])):  # Last 20 entries
-                self.create_history_entry(history_scroll, result, i)
-                
-    def create_history_entry(self, parent, result, index):
-        """Create a history entry widget"""
-        entry_frame = ctk.CTkFrame(parent, fg_color="#333333", corner_radius=10)
-        entry_frame.pack(fill="x", padx=15, pady=8)
-        
-        # Left side - image thumbnail
-        if result.image is not None:
-            image_rgb = cv2.cvtColor(result.image, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(image_rgb)
-            pil_image.thumbnail((80, 80), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(pil_image)
-            
-            image_label = ctk.CTkLabel(entry_frame, image=photo, text="")
-            image_label.image = photo
-            image_label.pack(side="left", padx=15, pady=15)
-        
-        # Middle - details
-        details_frame = ctk.CTkFrame(entry_frame, fg_color="transparent")
-        details_frame.pack(side="left", fill="both", expand=True, padx=(0, 15))
-        
-        # Timestamp
-        timestamp_label = ctk.CTkLabel(
-            details_frame,
-            text=result.timestamp.strftime("%B %d, %Y at %I:%M %p"),
-            font=ctk.CTkFont(size=12),
-            text_color="#888888"
+            return
+            
+        # History list - one Treeview instead of a frame of labels per entry
+        columns = ("timestamp", "type", "condition", "freshness", "safety")
+        self.history_tree = ttk.Treeview(
+            history_frame,
+            columns=columns,
+            show="tree headings",
+            style="History.Treeview",
+            selectmode="browse"
+        )
+        self.history_tree.heading("#0", text="")
+        self.history_tree.column("#0", width=110, stretch=False)
+        for column, heading, width in zip(
+            columns,
+            ("Timestamp", "Type", "Condition", "Freshness", "Safety"),
+            (220, 140, 140, 100, 220)
+        ):
+            self.history_tree.heading(column, text=heading)
+            self.history_tree.column(column, width=width, anchor="w")
+            
+        history_scrollbar = ctk.CTkScrollbar(history_frame, command=self.history_tree.yview)
+        
+        # Tk reports every scroll and resize here, so thumbnails follow the viewport
+        self._history_rows = ()
+        self._history_shown = set()
+        
+        def on_history_scroll(first, last):
+            history_scrollbar.set(first, last)
+            self.show_visible_history_thumbnails(first, last)
+            
+        self.history_tree.configure(yscrollcommand=on_history_scroll)
+        history_scrollbar.pack(side="right", fill="y", padx=(0, 10), pady=15)
+        self.history_tree.pack(side="left", fill="both", expand=True, padx=(15, 0), pady=15)
+        
+        # Double-click a row, or select it and press the button, to open it
+        self.history_tree.bind("<Double-1>", lambda e: self.view_selected_history())
+        view_btn = ctk.CTkButton(
+            history_container,
+            text="View Details",
+            command=self.view_selected_history,
+            font=_font(size=12, weight="bold"),
+            height=35,
+            corner_radius=8,
+            fg_color="#2196F3"
         )
-        timestamp_label.pack(anchor="w", pady=(15, 5))
+        view_btn.pack(pady=15)
         
-        # Fruit info
-        info_text = f"{result.fruit_type} - {result.condition.split(' - ')[0]}"
-        info_label = ctk.CTkLabel(
-            details_frame,
-            text=info_text,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            text_color=self.get_condition_color(result.condition)
-        )
-        info_label.pack(anchor="w")
+        self.refresh_history_tree()
         
-        # Metrics
-        metrics_text = f"Freshness: {result.freshness_score:.0f}% | Confidence: {result.confidence:.0f}%"
-        metrics_label = ctk.CTkLabel(
-            details_frame,
-            text=metrics_text,
-            font=ctk.CTkFont(size=11),
-            text_color="#cccccc"
-        )
-        metrics_label.pack(anchor="w", pady=(5, 15))
+    def refresh_history_tree(self):
+        """Refill the history Treeview, newest first"""
+        tree = self.history_tree
+        tree.delete(*tree.get_children())
         
-        # Right side - actions
-        actions_frame = ctk.CTkFrame(entry_frame, fg_color="transparent")
-        actions_frame.pack(side="right", padx=15)
+        # Thumbnails are attached as rows scroll into view
+        self._history_shown = set()
         
-        view_btn = ctk.CTkButton(
-            actions_frame,
-            text="View Details",
-            command=lambda r=result: self.view_history_details(r),
-            font=ctk.CTkFont(size=11),
-            width=100,
-            height=30,
-            corner_radius=6,
-            fg_color="#2196F3"
-        )
-        view_btn.pack(pady=5)
+        for index in range(len(self.analysis_history) - 1, -1, -1):
+            result = self.analysis_history[index]
+            condition = result.condition.split(' - ')[0]
+            
+            # Colour each row's text by its condition
+            color = self.get_condition_color(result.condition)
+            tree.tag_configure(color, foreground=color)
+            
+            row = {
+                'values': (
+                    result.timestamp.strftime("%B %d, %Y at %I:%M %p"),
+                    result.fruit_type,
+                    condition,
+                    f"{result.freshness_score:.0f}%",
+                    result.safety
+                ),
+                'tags': (color,)
+            }
+            
+            # Row ids are indexes into analysis_history
+            tree.insert("", "end", iid=str(index), **row)
+            
+        self._history_rows = tree.get_children()
         
+    def show_visible_history_thumbnails(self, first, last):
+        """Attach thumbnails to the history rows inside the visible fraction [first, last]"""
+        rows = self._history_rows
+        start = int(float(first) * len(rows))
+        stop = min(len(rows), int(float(last) * len(rows)) + 1)
+        
+        for iid in rows[start:stop]:
+            if iid in self._history_shown:
+                continue
+            self._history_shown.add(iid)
+            
+            index = int(iid)
+            if index not in self._history_photos:
+                thumbnail = self.analysis_history[index].thumbnail
+                self._history_photos[index] = None if thumbnail is None else \
+                    ImageTk.PhotoImage(Image.fromarray(self.fit_for_display(thumbnail, 80, 80)))
+            if self._history_photos[index] is not None:
+                self.history_tree.item(iid, image=self._history_photos[index])
+            
+    def view_selected_history(self):
+        """Open the history entry selected in the Treeview"""
+        selection = self.history_tree.selection()
+        if selection:
+            self.view_history_details(self.analysis_history[int(selection[0])])
+            
     def view_history_details(self, result):
         """View detailed history entry"""
         # Switch to analysis view and load the result
         self.show_analysis_view()
         
         # Display the historical image
-        if result.image is not None:
-            self.current_image_cv2 = result.image
-            self.display_image_in_analysis(result.image)
+        image = self.load_result_image(result)
+        if image is not None:
+            self.current_image_cv2 = image
+            self.current_image_bytes = result.image_bytes
+            self.display_image_in_analysis(image)
             
         # Display the historical results
         self.current_result = result
         self.display_analysis_results(result)
         
+    def load_result_image(self, result):
+        """Decode a result's full image, falling back to its thumbnail"""
+        if result.image_bytes is not None:
+            image = cv2.imdecode(np.frombuffer(result.image_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if image is not None:
+                return image
+        return result.thumbnail
+        
     def show_reports_view(self):
         """Show reports view"""
         self.clear_main_view()
@@ -1090,7 +1332,7 @@ class AdvancedFruitAnalyzerUI:
         title = ctk.CTkLabel(
             reports_container,
             text="📋 Export Reports",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=_font(size=24, weight="bold"),
             text_color="#ffffff"
         )
         title.pack(pady=(10, 30))
@@ -1118,7 +1360,7 @@ class AdvancedFruitAnalyzerUI:
                 option_frame,
                 text=text,
                 command=command,
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 height=50,
                 corner_radius=8,
                 fg_color=color,
@@ -1130,7 +1372,7 @@ class AdvancedFruitAnalyzerUI:
             desc_label = ctk.CTkLabel(
                 option_frame,
                 text=description,
-                font=ctk.CTkFont(size=12),
+                font=_font(size=12),
                 text_color="#888888",
                 anchor="w"
             )
@@ -1147,7 +1389,7 @@ class AdvancedFruitAnalyzerUI:
         title = ctk.CTkLabel(
             settings_container,
             text="⚙️ Settings",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=_font(size=24, weight="bold"),
             text_color="#ffffff"
         )
         title.pack(pady=(10, 30))
@@ -1182,7 +1424,7 @@ class AdvancedFruitAnalyzerUI:
         section_title = ctk.CTkLabel(
             section_frame,
             text=title,
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#ffffff"
         )
         section_title.pack(anchor="w", padx=20, pady=(15, 10))
@@ -1194,7 +1436,7 @@ class AdvancedFruitAnalyzerUI:
             label = ctk.CTkLabel(
                 setting_frame,
                 text=setting_name,
-                font=ctk.CTkFont(size=14),
+                font=_font(size=14),
                 text_color="#cccccc",
                 width=150,
                 anchor="w"
@@ -1224,7 +1466,7 @@ class AdvancedFruitAnalyzerUI:
         title = ctk.CTkLabel(
             help_container,
             text="❓ Help & Guide",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=_font(size=24, weight="bold"),
             text_color="#ffffff"
         )
         title.pack(pady=(10, 30))
@@ -1269,22 +1511,22 @@ class AdvancedFruitAnalyzerUI:
             title_label = ctk.CTkLabel(
                 section_frame,
                 text=section_title,
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#ffffff"
             )
             title_label.pack(anchor="w", padx=20, pady=(15, 10))
             
-            for item in content:
-                item_label = ctk.CTkLabel(
-                    section_frame,
-                    text=item,
-                    font=ctk.CTkFont(size=13),
-                    text_color="#cccccc",
-                    anchor="w",
-                    justify="left"
-                )
-                item_label.pack(anchor="w", padx=30, pady=3)
-                
+            # All items of a section in one label
+            items_label = ctk.CTkLabel(
+                section_frame,
+                text="\n".join(content),
+                font=_font(size=13),
+                text_color="#cccccc",
+                anchor="w",
+                justify="left"
+            )
+            items_label.pack(anchor="w", padx=30, pady=(3, 15))
+            
             section_frame.pack(pady=(0, 5))
             
     def highlight_nav_button(self, button_text):
@@ -1329,7 +1571,7 @@ class AdvancedFruitAnalyzerUI:
         instructions = ctk.CTkLabel(
             camera_frame,
             text="Position the fruit in the center and press SPACE or click CAPTURE",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#4CAF50"
         )
         instructions.pack(pady=15)
@@ -1338,6 +1580,15 @@ class AdvancedFruitAnalyzerUI:
         self.video_canvas = tk.Canvas(camera_frame, bg="#000000", highlightthickness=0)
         self.video_canvas.pack(fill="both", expand=True, padx=10, pady=10)
         
+        # One image item and PhotoImage, refilled with each new frame; the worker
+        # resizes frames to the canvas size it reads from _video_size
+        self._video_size = (0, 0)
+        self.video_canvas.bind("<Configure>", lambda e: setattr(self, '_video_size', (e.width, e.height)))
+        self._video_img_id = self.video_canvas.create_image(0, 0, anchor=tk.NW)
+        self._video_photo = None
+        self._last_frame_id = 0
+        self._overlay_geometry = None
+        
         # Controls
         control_frame = ctk.CTkFrame(camera_frame, fg_color="#2a2a2a", corner_radius=10)
         control_frame.pack(fill="x", padx=10, pady=10)
@@ -1347,7 +1598,7 @@ class AdvancedFruitAnalyzerUI:
             control_frame,
             text="📸 CAPTURE (SPACE)",
             command=self.capture_camera_image,
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             height=50,
             fg_color="#4CAF50",
             hover_color="#45a049",
@@ -1392,6 +1643,7 @@ class AdvancedFruitAnalyzerUI:
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             
+            frame_id = 0
             while self.camera_active:
                 ret, frame = cap.read()
                 if ret:
@@ -1399,8 +1651,15 @@ class AdvancedFruitAnalyzerUI:
                     frame = self.add_camera_overlay(frame)
                     self.current_frame = frame
                     
+                    # Scale to the canvas and convert to RGB here so the Tk thread doesn't have to
+                    width, height = self._video_size
+                    if width > 1 and height > 1:
+                        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    frame_id += 1
+                    
                     try:
-                        self.frame_queue.put_nowait(frame)
+                        self.frame_queue.put_nowait((frame_id, frame))
                     except queue.Full:
                         pass
                         
@@ -1416,27 +1675,25 @@ class AdvancedFruitAnalyzerUI:
             return
             
         try:
-            frame = None
+            item = None
             while not self.frame_queue.empty():
-                frame = self.frame_queue.get_nowait()
+                item = self.frame_queue.get_nowait()
                 
-            if frame is not None:
-                # Convert to PIL
-                cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(cv2image)
+            # Only touch the canvas when a frame we haven't shown arrived
+            if item is not None and item[0] != self._last_frame_id:
+                self._last_frame_id, frame = item
                 
-                # Resize to fit canvas
-                canvas_width = self.video_canvas.winfo_width()
-                canvas_height = self.video_canvas.winfo_height()
+                # Wrap the worker's RGB buffer without copying it
+                height, width = frame.shape[:2]
+                img = Image.frombuffer('RGB', (width, height), frame, 'raw', 'RGB', 0, 1)
                 
-                if canvas_width > 1 and canvas_height > 1:
-                    img = img.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-                    
-                # Display
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.video_canvas.delete("all")
-                self.video_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
-                self.video_canvas.image = imgtk
+                # Display: refill the PhotoImage in place, new one only on resize
+                if self._video_photo is not None and \
+                        (self._video_photo.width(), self._video_photo.height()) == img.size:
+                    self._video_photo.paste(img)
+                else:
+                    self._video_photo = ImageTk.PhotoImage(image=img)
+                    self.video_canvas.itemconfig(self._video_img_id, image=self._video_photo)
                 
         except Exception as e:
             print(f"Display error: {e}")
@@ -1446,42 +1703,47 @@ class AdvancedFruitAnalyzerUI:
             
     def add_camera_overlay(self, frame):
         """Add overlay to camera frame"""
+        # The guide geometry only changes with the frame size
         height, width = frame.shape[:2]
-        overlay = frame.copy()
+        if self._overlay_geometry is None or self._overlay_geometry[0] != (height, width):
+            self._overlay_geometry = ((height, width),) + self.camera_overlay_geometry(height, width)
+        _, indices, green = self._overlay_geometry
+        
+        # Blend 70/30 with green on the guide pixels only; 0.7x + 0.3x leaves the rest unchanged
+        pixels = frame.reshape(-1, 3)
+        pixels[indices] = cv2.addWeighted(pixels[indices], 0.7, green, 0.3, 0)
+        return frame
+        
+    def camera_overlay_geometry(self, height, width):
+        """Flat pixel indices of the guide circle and corner brackets, and their green colour"""
+        mask = np.zeros((height, width), dtype=np.uint8)
         
         # Center circle
         center_x, center_y = width // 2, height // 2
-        cv2.circle(overlay, (center_x, center_y), 100, (0, 255, 0), 3)
+        cv2.circle(mask, (center_x, center_y), 100, 255, 3)
         
         # Corner brackets
         bracket_size = 40
         bracket_thickness = 3
         corners = [
-            (50, 50), (width-50, 50),
-            (50, height-50), (width-50, height-50)
+            (50, 50, 1, 1), (width-50, 50, -1, 1),
+            (50, height-50, 1, -1), (width-50, height-50, -1, -1)
         ]
         
-        for i, (x, y) in enumerate(corners):
-            if i == 0:  # Top-left
-                cv2.line(overlay, (x, y), (x+bracket_size, y), (0, 255, 0), bracket_thickness)
-                cv2.line(overlay, (x, y), (x, y+bracket_size), (0, 255, 0), bracket_thickness)
-            elif i == 1:  # Top-right
-                cv2.line(overlay, (x, y), (x-bracket_size, y), (0, 255, 0), bracket_thickness)
-                cv2.line(overlay, (x, y), (x, y+bracket_size), (0, 255, 0), bracket_thickness)
-            elif i == 2:  # Bottom-left
-                cv2.line(overlay, (x, y), (x+bracket_size, y), (0, 255, 0), bracket_thickness)
-                cv2.line(overlay, (x, y), (x, y-bracket_size), (0, 255, 0), bracket_thickness)
-            else:  # Bottom-right
-                cv2.line(overlay, (x, y), (x-bracket_size, y), (0, 255, 0), bracket_thickness)
-                cv2.line(overlay, (x, y), (x, y-bracket_size), (0, 255, 0), bracket_thickness)
-                
-        # Blend
-        return cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
+        for x, y, dx, dy in corners:
+            cv2.line(mask, (x, y), (x + dx*bracket_size, y), 255, bracket_thickness)
+            cv2.line(mask, (x, y), (x, y + dy*bracket_size), 255, bracket_thickness)
+            
+        indices = np.flatnonzero(mask)
+        green = np.zeros((len(indices), 3), dtype=np.uint8)
+        green[:, 1] = 255
+        return indices, green
         
     def capture_camera_image(self):
         """Capture current camera frame"""
         if hasattr(self, 'current_frame'):
             self.current_image_cv2 = self.current_frame.copy()
+            self.current_image_bytes = None
             self.camera_active = False
             
             if hasattr(self, 'camera_window'):
@@ -1504,9 +1766,13 @@ class AdvancedFruitAnalyzerUI:
         
         if file_path:
             try:
-                image = cv2.imread(file_path)
+                # Keep the file bytes so history can re-decode the image later
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+                image = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
                 if image is not None:
                     self.current_image_cv2 = image
+                    self.current_image_bytes = raw
                     self.display_image_in_analysis(image)
                     self.analyze_button.configure(state="normal")
                     self.show_notification("✅ Image loaded successfully!", "success")
@@ -1525,26 +1791,33 @@ class AdvancedFruitAnalyzerUI:
         
         if url:
             try:
-                response = requests.get(url, timeout=10)
-                if response.status_code == 200:
-                    img_array = np.asarray(bytearray(response.content), dtype=np.uint8)
-                    image = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+                # Runs on the Tk thread, so a stalled server may only hold the UI briefly
+                with self._session.get(url, stream=True, timeout=(5, 10)) as response:
+                    status_code = response.status_code
+                    # Read the body once into a single bytes object (gzip etc. still undone)
+                    raw = response.raw.read(decode_content=True) if status_code == 200 else None
+                    
+                if status_code == 200:
+                    # frombuffer wraps the download without copying it
+                    image = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
                     
                     if image is not None:
                         self.current_image_cv2 = image
+                        self.current_image_bytes = raw
                         self.display_image_in_analysis(image)
                         self.analyze_button.configure(state="normal")
                         self.show_notification("✅ Image loaded from URL!", "success")
                     else:
                         self.show_notification("❌ Could not decode image", "error")
                 else:
-                    self.show_notification(f"❌ Failed to download: {response.status_code}", "error")
+                    self.show_notification(f"❌ Failed to download: {status_code}", "error")
             except Exception as e:
                 self.show_notification(f"❌ Error: {str(e)}", "error")
                 
     def clear_image(self):
         """Clear current image"""
         self.current_image_cv2 = None
+        self.current_image_bytes = None
         self.current_result = None
         
         # Reset image display
@@ -1560,7 +1833,7 @@ class AdvancedFruitAnalyzerUI:
         self.no_info_label = ctk.CTkLabel(
             self.quick_info_frame,
             text="Load an image and click\n'Analyze' to see results",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#666666"
         )
         self.no_info_label.pack(expand=True)
@@ -1611,7 +1884,7 @@ class AdvancedFruitAnalyzerUI:
         progress_label = ctk.CTkLabel(
             self.quick_info_frame,
             text="🔬 Analyzing fruit...",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#4CAF50"
         )
         progress_label.pack(pady=20)
@@ -1627,51 +1900,59 @@ class AdvancedFruitAnalyzerUI:
         progress_bar.set(0)
         
         # Perform analysis in thread
+        image = self.current_image_cv2
+        image_bytes = self.current_image_bytes
+        
+        def set_progress(value, text):
+            progress_bar.set(value)
+            progress_label.configure(text=text)
+            
+        def finish(result, error):
+            # All end-of-analysis UI updates happen in this one Tk callback
+            self.analyze_button.configure(state="normal", text="🔬 ANALYZE FRUIT")
+            self.update_status("● System Ready")
+            if error is not None:
+                self.show_notification(f"❌ Analysis failed: {error}", "error")
+                return
+            set_progress(1.0, "✅ Analysis complete!")
+            
+            # Display results
+            self.root.after(500, self.display_analysis_results, result)
+            
         def analysis_thread():
+            # Update progress
+            self.post_to_ui(set_progress, 0.3, "🔍 Analyzing visual features...")
+            
             try:
-                # Update progress
-                self.root.after(0, lambda: progress_bar.set(0.3))
-                self.root.after(0, lambda: progress_label.configure(text="🔍 Analyzing visual features..."))
-                
                 # Perform analysis
-                result = self.perform_fruit_analysis(self.current_image_cv2)
+                # A JPEG file is handed over so it can be uploaded without re-encoding
+                is_jpeg = image_bytes is not None and image_bytes.startswith(b'\xff\xd8\xff')
+                result = self.perform_fruit_analysis(image, image_bytes if is_jpeg else None)
                 self.current_result = result
                 
-                # Add to history
+                # Add to history with a thumbnail and the encoded image, not the full frame
                 result.timestamp = datetime.now()
-                result.image = self.current_image_cv2.copy()
+                result.thumbnail = self.shrink_to_fit(image, 256, 256).copy()
+                result.image_bytes = image_bytes
+                if result.image_bytes is None:
+                    result.image_bytes = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes()
                 self.analysis_history.append(result)
-                
-                # Update UI
-                self.root.after(0, lambda: progress_bar.set(1.0))
-                self.root.after(0, lambda: progress_label.configure(text="✅ Analysis complete!"))
-                
-                # Display results
-                self.root.after(500, lambda: self.display_analysis_results(result))
-                
             except Exception as e:
-                self.root.after(0, lambda: self.show_notification(f"❌ Analysis failed: {str(e)}", "error"))
-            finally:
-                self.root.after(0, lambda: self.analyze_button.configure(
-                    state="normal",
-                    text="🔬 ANALYZE FRUIT"
-                ))
-                self.root.after(0, lambda: self.update_status("● System Ready"))
+                self.post_to_ui(finish, None, str(e))
+                return
                 
-        thread = threading.Thread(target=analysis_thread, daemon=True)
-        thread.start()
+            self.post_to_ui(finish, result, None)
+                
+        self._pool.submit(analysis_thread)
         
     def display_analysis_results(self, result):
         """Display analysis results in UI"""
         # Update quick info
         self.display_quick_info(result)
         
-        # Update detailed tabs
-        self.display_condition_details(result)
-        self.display_health_details(result)
-        self.display_metrics_details(result)
-        self.display_recommendations(result)
-        self.display_technical_data(result)
+        # Update detailed tabs: the visible one now, the others when opened
+        self._tab_pending = dict.fromkeys(self._tab_builders, result)
+        self.refresh_result_tab(self.results_notebook.get())
         
         # Show notification
         if 'BAD' in result.condition or 'POOR' in result.condition:
@@ -1700,7 +1981,7 @@ class AdvancedFruitAnalyzerUI:
         condition_label = ctk.CTkLabel(
             condition_card,
             text=condition_text,
-            font=ctk.CTkFont(size=20, weight="bold"),
+            font=_font(size=20, weight="bold"),
             text_color="#ffffff"
         )
         condition_label.pack(pady=15)
@@ -1723,7 +2004,7 @@ class AdvancedFruitAnalyzerUI:
             label_widget = ctk.CTkLabel(
                 metric_frame,
                 text=f"{label}:",
-                font=ctk.CTkFont(size=12),
+                font=_font(size=12),
                 text_color="#888888",
                 width=100,
                 anchor="w"
@@ -1733,7 +2014,7 @@ class AdvancedFruitAnalyzerUI:
             value_widget = ctk.CTkLabel(
                 metric_frame,
                 text=value,
-                font=ctk.CTkFont(size=12, weight="bold"),
+                font=_font(size=12, weight="bold"),
                 text_color="#ffffff",
                 anchor="w"
             )
@@ -1751,7 +2032,7 @@ class AdvancedFruitAnalyzerUI:
             action_label = ctk.CTkLabel(
                 action_card,
                 text=f"⚠️ {result.action_required}",
-                font=ctk.CTkFont(size=14, weight="bold"),
+                font=_font(size=14, weight="bold"),
                 text_color="#ffffff",
                 wraplength=300
             )
@@ -1776,7 +2057,7 @@ class AdvancedFruitAnalyzerUI:
         condition_label = ctk.CTkLabel(
             header_frame,
             text=result.condition,
-            font=ctk.CTkFont(size=22, weight="bold"),
+            font=_font(size=22, weight="bold"),
             text_color="#ffffff"
         )
         condition_label.pack(pady=20)
@@ -1788,7 +2069,7 @@ class AdvancedFruitAnalyzerUI:
         conf_label = ctk.CTkLabel(
             confidence_frame,
             text="AI Confidence Score",
-            font=ctk.CTkFont(size=14),
+            font=_font(size=14),
             text_color="#888888"
         )
         conf_label.pack()
@@ -1807,7 +2088,7 @@ class AdvancedFruitAnalyzerUI:
         conf_percent = ctk.CTkLabel(
             confidence_frame,
             text=f"{result.confidence:.0f}%",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=_font(size=24, weight="bold"),
             text_color=condition_color
         )
         conf_percent.pack()
@@ -1830,7 +2111,7 @@ class AdvancedFruitAnalyzerUI:
             label_widget = ctk.CTkLabel(
                 detail_frame,
                 text=f"{label}:",
-                font=ctk.CTkFont(size=14),
+                font=_font(size=14),
                 text_color="#888888",
                 width=150,
                 anchor="w"
@@ -1840,7 +2121,7 @@ class AdvancedFruitAnalyzerUI:
             value_widget = ctk.CTkLabel(
                 detail_frame,
                 text=str(value),
-                font=ctk.CTkFont(size=14, weight="bold"),
+                font=_font(size=14, weight="bold"),
                 text_color="#ffffff",
                 anchor="w"
             )
@@ -1854,7 +2135,7 @@ class AdvancedFruitAnalyzerUI:
             analysis_title = ctk.CTkLabel(
                 analysis_frame,
                 text="📝 Detailed Analysis",
-                font=ctk.CTkFont(size=14, weight="bold"),
+                font=_font(size=14, weight="bold"),
                 text_color="#ffffff"
             )
             analysis_title.pack(anchor="w", padx=15, pady=(10, 5))
@@ -1862,7 +2143,7 @@ class AdvancedFruitAnalyzerUI:
             analysis_text = ctk.CTkLabel(
                 analysis_frame,
                 text=result.detailed_analysis,
-                font=ctk.CTkFont(size=12),
+                font=_font(size=12),
                 text_color="#cccccc",
                 wraplength=600,
                 anchor="w",
@@ -1884,7 +2165,7 @@ class AdvancedFruitAnalyzerUI:
             disease_title = ctk.CTkLabel(
                 disease_frame,
                 text="🦠 Detected Issues",
-                font=ctk.CTkFont(size=18, weight="bold"),
+                font=_font(size=18, weight="bold"),
                 text_color="#ff6666"
             )
             disease_title.pack(pady=(15, 10))
@@ -1896,7 +2177,7 @@ class AdvancedFruitAnalyzerUI:
                 defect_label = ctk.CTkLabel(
                     defect_item,
                     text=f"⚠️ {defect}",
-                    font=ctk.CTkFont(size=14),
+                    font=_font(size=14),
                     text_color="#ffaaaa",
                     wraplength=500,
                     anchor="w",
@@ -1910,7 +2191,7 @@ class AdvancedFruitAnalyzerUI:
             healthy_label = ctk.CTkLabel(
                 healthy_frame,
                 text="✅ No significant health issues detected",
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#66ff66"
             )
             healthy_label.pack(pady=30)
@@ -1923,7 +2204,7 @@ class AdvancedFruitAnalyzerUI:
             id_title = ctk.CTkLabel(
                 disease_id_frame,
                 text="🔬 Disease Identification",
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#ffffff"
             )
             id_title.pack(pady=(15, 10))
@@ -1931,7 +2212,7 @@ class AdvancedFruitAnalyzerUI:
             id_label = ctk.CTkLabel(
                 disease_id_frame,
                 text=result.disease_identification,
-                font=ctk.CTkFont(size=14),
+                font=_font(size=14),
                 text_color="#ff9800",
                 wraplength=500
             )
@@ -1944,7 +2225,7 @@ class AdvancedFruitAnalyzerUI:
         safety_title = ctk.CTkLabel(
             safety_frame,
             text="🏥 Safety Assessment",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#ffffff"
         )
         safety_title.pack(pady=(15, 10))
@@ -1969,7 +2250,7 @@ class AdvancedFruitAnalyzerUI:
         safety_text = ctk.CTkLabel(
             safety_indicator,
             text=f"{safety_icon} {result.safety.upper()}",
-            font=ctk.CTkFont(size=20, weight="bold"),
+            font=_font(size=20, weight="bold"),
             text_color=safety_color
         )
         safety_text.pack(pady=20, padx=30)
@@ -1982,7 +2263,7 @@ class AdvancedFruitAnalyzerUI:
             obs_title = ctk.CTkLabel(
                 obs_frame,
                 text="🔍 Key Observations",
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#ffffff"
             )
             obs_title.pack(pady=(15, 10))
@@ -1994,7 +2275,7 @@ class AdvancedFruitAnalyzerUI:
                 obs_label = ctk.CTkLabel(
                     obs_item,
                     text=f"• {obs}",
-                    font=ctk.CTkFont(size=12),
+                    font=_font(size=12),
                     text_color="#cccccc",
                     wraplength=500,
                     anchor="w",
@@ -2015,7 +2296,7 @@ class AdvancedFruitAnalyzerUI:
         dashboard_title = ctk.CTkLabel(
             dashboard_frame,
             text="📊 Quality Metrics Dashboard",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             text_color="#ffffff"
         )
         dashboard_title.pack(pady=(15, 20))
@@ -2047,7 +2328,7 @@ class AdvancedFruitAnalyzerUI:
             name_label = ctk.CTkLabel(
                 metric_card,
                 text=name,
-                font=ctk.CTkFont(size=14),
+                font=_font(size=14),
                 text_color="#cccccc"
             )
             name_label.pack(pady=(15, 5))
@@ -2056,7 +2337,7 @@ class AdvancedFruitAnalyzerUI:
             value_label = ctk.CTkLabel(
                 metric_card,
                 text=f"{value:.1f}{unit}",
-                font=ctk.CTkFont(size=24, weight="bold"),
+                font=_font(size=24, weight="bold"),
                 text_color=color
             )
             value_label.pack(pady=(0, 5))
@@ -2084,7 +2365,7 @@ class AdvancedFruitAnalyzerUI:
         viz_title = ctk.CTkLabel(
             viz_frame,
             text="📈 Metrics Visualization",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#ffffff"
         )
         viz_title.pack(pady=(15, 10))
@@ -2144,7 +2425,7 @@ class AdvancedFruitAnalyzerUI:
             action_title = ctk.CTkLabel(
                 action_frame,
                 text="🚨 Immediate Action Required",
-                font=ctk.CTkFont(size=18, weight="bold"),
+                font=_font(size=18, weight="bold"),
                 text_color="#ffffff"
             )
             action_title.pack(pady=(15, 10))
@@ -2152,7 +2433,7 @@ class AdvancedFruitAnalyzerUI:
             action_text = ctk.CTkLabel(
                 action_frame,
                 text=result.action_required.upper(),
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#ffffff",
                 wraplength=600
             )
@@ -2166,7 +2447,7 @@ class AdvancedFruitAnalyzerUI:
             tips_title = ctk.CTkLabel(
                 tips_frame,
                 text="💡 Prevention Tips",
-                font=ctk.CTkFont(size=18, weight="bold"),
+                font=_font(size=18, weight="bold"),
                 text_color="#4CAF50"
             )
             tips_title.pack(pady=(15, 10))
@@ -2178,7 +2459,7 @@ class AdvancedFruitAnalyzerUI:
                 tip_text = ctk.CTkLabel(
                     tip_item,
                     text=f"{i}. {tip}",
-                    font=ctk.CTkFont(size=14),
+                    font=_font(size=14),
                     text_color="#aaffaa",
                     wraplength=550,
                     anchor="w",
@@ -2194,7 +2475,7 @@ class AdvancedFruitAnalyzerUI:
             storage_title = ctk.CTkLabel(
                 storage_frame,
                 text="📦 Storage Recommendations",
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#ffffff"
             )
             storage_title.pack(pady=(15, 10))
@@ -2202,7 +2483,7 @@ class AdvancedFruitAnalyzerUI:
             storage_text = ctk.CTkLabel(
                 storage_frame,
                 text=result.storage_advice,
-                font=ctk.CTkFont(size=14),
+                font=_font(size=14),
                 text_color="#cccccc",
                 wraplength=600,
                 justify="left"
@@ -2217,7 +2498,7 @@ class AdvancedFruitAnalyzerUI:
             treatment_title = ctk.CTkLabel(
                 treatment_frame,
                 text="🏥 Treatment Options",
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=_font(size=16, weight="bold"),
                 text_color="#FFA500"
             )
             treatment_title.pack(pady=(15, 10))
@@ -2226,7 +2507,7 @@ class AdvancedFruitAnalyzerUI:
                 treat_label = ctk.CTkLabel(
                     treatment_frame,
                     text=f"→ {treatment}",
-                    font=ctk.CTkFont(size=13),
+                    font=_font(size=13),
                     text_color="#FFD700",
                     anchor="w",
                     wraplength=550
@@ -2242,7 +2523,7 @@ class AdvancedFruitAnalyzerUI:
         practices_title = ctk.CTkLabel(
             practices_frame,
             text="📚 Best Practices",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#9C27B0"
         )
         practices_title.pack(pady=(15, 10))
@@ -2254,7 +2535,7 @@ class AdvancedFruitAnalyzerUI:
             practice_label = ctk.CTkLabel(
                 practices_frame,
                 text=f"✓ {practice}",
-                font=ctk.CTkFont(size=13),
+                font=_font(size=13),
                 text_color="#E1BEE7",
                 anchor="w",
                 wraplength=550
@@ -2323,7 +2604,7 @@ class AdvancedFruitAnalyzerUI:
         summary_title = ctk.CTkLabel(
             summary_frame,
             text="📊 Analysis Summary",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=_font(size=18, weight="bold"),
             text_color="#ffffff"
         )
         summary_title.pack(pady=(15, 10))
@@ -2343,7 +2624,7 @@ class AdvancedFruitAnalyzerUI:
             sum_label = ctk.CTkLabel(
                 sum_frame,
                 text=f"{label}:",
-                font=ctk.CTkFont(size=13),
+                font=_font(size=13),
                 text_color="#888888",
                 width=200,
                 anchor="w"
@@ -2353,7 +2634,7 @@ class AdvancedFruitAnalyzerUI:
             sum_value = ctk.CTkLabel(
                 sum_frame,
                 text=value,
-                font=ctk.CTkFont(size=13, weight="bold"),
+                font=_font(size=13, weight="bold"),
                 text_color="#ffffff",
                 anchor="w"
             )
@@ -2366,7 +2647,7 @@ class AdvancedFruitAnalyzerUI:
         data_title = ctk.CTkLabel(
             data_frame,
             text="📄 Complete Technical Data",
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=_font(size=16, weight="bold"),
             text_color="#ffffff"
         )
         data_title.pack(pady=(15, 10))
@@ -2376,7 +2657,7 @@ class AdvancedFruitAnalyzerUI:
             data_frame,
             fg_color="#222222",
             corner_radius=8,
-            font=ctk.CTkFont(family="Consolas", size=12),
+            font=_font(family="Consolas", size=12),
             height=400
         )
         json_frame.pack(fill="both", expand=True, padx=15, pady=(0, 15))
@@ -2429,7 +2710,7 @@ class AdvancedFruitAnalyzerUI:
             export_frame,
             text="📥 Export as JSON",
             command=lambda: self.export_technical_data(technical_data, "json"),
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=_font(size=12, weight="bold"),
             height=35,
             corner_radius=8,
             fg_color="#2196F3"
@@ -2440,7 +2721,7 @@ class AdvancedFruitAnalyzerUI:
             export_frame,
             text="📊 Export as CSV",
             command=lambda: self.export_technical_data(technical_data, "csv"),
-            font=ctk.CTkFont(size=12, weight="bold"),
+            font=_font(size=12, weight="bold"),
             height=35,
             corner_radius=8,
             fg_color="#4CAF50"
@@ -2449,13 +2730,17 @@ class AdvancedFruitAnalyzerUI:
         
     def clear_all_result_tabs(self):
         """Clear all result tab contents"""
-        tabs_to_clear = [
-            self.condition_content,
-            self.health_content,
-            self.metrics_content,
-            self.recommendations_content,
-            self.technical_content
-        ]
+        self._tab_pending.clear()
+        
+        # Tabs that were never opened still show their initial placeholder
+        contents = {
+            "🎯 Condition": 'condition_content',
+            "🦠 Health Status": 'health_content',
+            "📊 Metrics": 'metrics_content',
+            "💡 Recommendations": 'recommendations_content',
+            "📈 Technical Data": 'technical_content'
+        }
+        tabs_to_clear = [getattr(self, contents[name]) for name, built in self._tab_initialized.items() if built]
         
         for tab in tabs_to_clear:
             for widget in tab.winfo_children():
@@ -2464,18 +2749,24 @@ class AdvancedFruitAnalyzerUI:
             placeholder = ctk.CTkLabel(
                 tab,
                 text="Perform analysis to see results",
-                font=ctk.CTkFont(size=14),
+                font=_font(size=14),
                 text_color="#666666"
             )
             placeholder.pack(pady=50)
             
-    def perform_fruit_analysis(self, image):
-        """Perform comprehensive fruit analysis"""
+    def perform_fruit_analysis(self, image, jpeg_bytes=None):
+        """Perform comprehensive fruit analysis (jpeg_bytes: the image's original JPEG file, if any)"""
+        # Downscale once and use the result for both the local metrics and the upload;
+        # the original file is only sent as-is when no downscale was needed
+        small = self.analysis_image(image)
+        if small is not image:
+            image, jpeg_bytes = small, None
+        
         # Local analysis
         local_metrics = self.perform_local_analysis(image)
         
         # AI analysis
-        ai_result = self.analyze_with_gemini(image)
+        ai_result = self.analyze_with_gemini(image, jpeg_bytes)
         
         # Combine results
         if ai_result:
@@ -2579,31 +2870,88 @@ class AdvancedFruitAnalyzerUI:
             treatment_options=treatment
         )
         
+    def analysis_image(self, image):
+        """Image shrunk to _MAX_ANALYSIS_EDGE (the image itself if already small enough)"""
+        height, width = image.shape[:2]
+        scale = _MAX_ANALYSIS_EDGE / max(height, width)
+        if scale >= 1:
+            return image
+            
+        key = id(image)
+        with self._analysis_images_lock:
+            entry = self._analysis_images.get(key)
+            if entry is not None and entry[0]() is image:
+                self._analysis_images.move_to_end(key)
+                return entry[1]
+                
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        with self._analysis_images_lock:
+            self._analysis_images[key] = (weakref.ref(image), small)
+            if len(self._analysis_images) > self._analysis_images_size:
+                self._analysis_images.popitem(last=False)
+        return small
+        
     def perform_local_analysis(self, image):
         """Perform local computer vision analysis"""
+        # Convert once; every metric below is a GIL-free OpenCV call on these
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
+        # With numba, the per-pixel metrics come out of one compiled pass
+        if _local_pixel_stats is not None:
+            brown_rot, black_spots, color_variance, freshness = \
+                self.fused_local_metrics(hsv, lab, gray)
+        else:
+            brown_rot = self.detect_brown_rot(hsv, lab)
+            black_spots = self.detect_black_spots(hsv, gray)
+            color_variance = self.analyze_color_uniformity(lab)
+            freshness = self.calculate_freshness_score(hsv, lab, image)
+        
         return {
-            'brown_rot_percentage': self.detect_brown_rot(hsv, lab),
-            'black_spots_percentage': self.detect_black_spots(hsv, gray),
-            'color_variance': self.analyze_color_uniformity(image),
-            'texture_score': self.analyze_texture_quality(image),
-            'shape_integrity': self.analyze_fruit_shape(image),
-            'freshness_score': self.calculate_freshness_score(hsv, lab, image)
+            'brown_rot_percentage': brown_rot,
+            'black_spots_percentage': black_spots,
+            'color_variance': color_variance,
+            'texture_score': self.analyze_texture_quality(gray),
+            'shape_integrity': self.analyze_fruit_shape(gray),
+            'freshness_score': freshness
         }
         
+    def fused_local_metrics(self, hsv_image, lab_image, gray_image):
+        """Brown rot, black spots, color uniformity and freshness from one kernel pass"""
+        brown_mask = np.empty(hsv_image.shape[:2], dtype=np.uint8)
+        black_mask = np.empty(hsv_image.shape[:2], dtype=np.uint8)
+        (sum_l, sum_l2, sum_a, sum_a2,
+         sum_b, sum_b2, sum_s) = _local_pixel_stats(hsv_image, lab_image, gray_image, brown_mask, black_mask)
+        
+        total_pixels = hsv_image.shape[0] * hsv_image.shape[1]
+        
+        # The masks still get the same morphological opening before counting
+        brown_mask = cv2.morphologyEx(brown_mask, cv2.MORPH_OPEN, _BROWN_KERNEL)
+        brown_rot = round((cv2.countNonZero(brown_mask) / total_pixels) * 100, 2)
+        black_mask = cv2.morphologyEx(black_mask, cv2.MORPH_OPEN, _BLACK_KERNEL)
+        black_spots = round((cv2.countNonZero(black_mask) / total_pixels) * 100, 2)
+        
+        # Population std from sum and sum of squares
+        stds = []
+        for channel_sum, channel_sum2 in ((sum_l, sum_l2), (sum_a, sum_a2), (sum_b, sum_b2)):
+            mean = channel_sum / total_pixels
+            stds.append(np.sqrt(max(channel_sum2 / total_pixels - mean * mean, 0.0)))
+        color_variance = round(stds[0] * 0.5 + stds[1] * 0.25 + stds[2] * 0.25, 2)
+        
+        brightness_score = (sum_l / total_pixels / 255) * 100
+        saturation_score = (sum_s / total_pixels / 255) * 100
+        freshness = round(min(brightness_score * 0.4 + saturation_score * 0.6, 100), 2)
+        
+        return brown_rot, black_spots, color_variance, freshness
+        
     def detect_brown_rot(self, hsv_image, lab_image):
         """Detect brown/rot areas"""
         # HSV detection
-        brown_lower = np.array([8, 50, 20])
-        brown_upper = np.array([20, 255, 200])
-        brown_mask = cv2.inRange(hsv_image, brown_lower, brown_upper)
+        brown_mask = cv2.inRange(hsv_image, _BROWN_LOW, _BROWN_HIGH)
         
         # Morphological operations
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        brown_mask = cv2.morphologyEx(brown_mask, cv2.MORPH_OPEN, kernel)
+        brown_mask = cv2.morphologyEx(brown_mask, cv2.MORPH_OPEN, _BROWN_KERNEL)
         
         # Calculate percentage
         total_pixels = hsv_image.shape[0] * hsv_image.shape[1]
@@ -2614,9 +2962,7 @@ class AdvancedFruitAnalyzerUI:
     def detect_black_spots(self, hsv_image, gray_image):
         """Detect black spots"""
         # Dark area detection
-        black_lower = np.array([0, 0, 0])
-        black_upper = np.array([180, 255, 50])
-        black_mask = cv2.inRange(hsv_image, black_lower, black_upper)
+        black_mask = cv2.inRange(hsv_image, _BLACK_LOW, _BLACK_HIGH)
         
         # Gray threshold
         _, dark_areas = cv2.threshold(gray_image, 30, 255, cv2.THRESH_BINARY_INV)
@@ -2625,8 +2971,7 @@ class AdvancedFruitAnalyzerUI:
         combined = cv2.bitwise_and(black_mask, dark_areas)
         
         # Remove noise
-        kernel = np.ones((3, 3), np.uint8)
-        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
+        combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, _BLACK_KERNEL)
         
         # Calculate percentage
         total_pixels = hsv_image.shape[0] * hsv_image.shape[1]
@@ -2634,32 +2979,28 @@ class AdvancedFruitAnalyzerUI:
         
         return round((black_pixels / total_pixels) * 100, 2)
         
-    def analyze_color_uniformity(self, image):
+    def analyze_color_uniformity(self, lab_image):
         """Analyze color uniformity"""
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        
-        l_std = np.std(lab[:,:,0])
-        a_std = np.std(lab[:,:,1])
-        b_std = np.std(lab[:,:,2])
+        # Per-channel standard deviations in one pass
+        _, stds = cv2.meanStdDev(lab_image)
+        l_std, a_std, b_std = stds.ravel()
         
         variance = (l_std * 0.5 + a_std * 0.25 + b_std * 0.25)
         
         return round(variance, 2)
         
-    def analyze_texture_quality(self, image):
+    def analyze_texture_quality(self, gray_image):
         """Analyze texture quality"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Laplacian for texture
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        texture_score = laplacian.var()
+        # Laplacian for texture (int16 holds every 3x3 response of a uint8 image exactly)
+        laplacian = cv2.Laplacian(gray_image, cv2.CV_16S)
+        _, std = cv2.meanStdDev(laplacian)
+        texture_score = std[0, 0] ** 2
         
         return round(min(texture_score, 100), 2)
         
-    def analyze_fruit_shape(self, image):
+    def analyze_fruit_shape(self, gray_image):
         """Analyze fruit shape integrity"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = cv2.GaussianBlur(gray_image, (5, 5), 0)
         
         # Edge detection
         edges = cv2.Canny(blurred, 50, 150)
@@ -2681,11 +3022,11 @@ class AdvancedFruitAnalyzerUI:
     def calculate_freshness_score(self, hsv_image, lab_image, bgr_image):
         """Calculate overall freshness score"""
         # Brightness
-        brightness = np.mean(lab_image[:,:,0])
+        brightness = cv2.mean(lab_image)[0]
         brightness_score = (brightness / 255) * 100
         
         # Saturation
-        saturation = np.mean(hsv_image[:,:,1])
+        saturation = cv2.mean(hsv_image)[1]
         saturation_score = (saturation / 255) * 100
         
         # Combined score
@@ -2693,10 +3034,34 @@ class AdvancedFruitAnalyzerUI:
         
         return round(min(freshness, 100), 2)
         
-    def analyze_with_gemini(self, image):
-        """Analyze with Gemini AI"""
+    def image_fingerprint(self, image):
+        """Exact digest of the pixels and shape, so only the very same image hits the cache"""
+        # A perceptual hash would give an "after" photo with new spots the "before" answer
+        digest = hashlib.blake2b(np.ascontiguousarray(image), digest_size=16)
+        digest.update(np.asarray(image.shape, dtype=np.int64))
+        return digest.digest()
+        
+    def analyze_with_gemini(self, image, jpeg_bytes=None):
+        """Analyze with Gemini AI, reusing the answer for an already analyzed image"""
+        # Re-analyzing the same photo skips the API call
+        key = self.image_fingerprint(image)
+        with self._ai_cache_lock:
+            if key in self._ai_cache:
+                self._ai_cache.move_to_end(key)
+                return self._ai_cache[key]
+        
+        result = self.request_gemini_analysis(image, jpeg_bytes)
+        if result is not None:
+            with self._ai_cache_lock:
+                self._ai_cache[key] = result
+                if len(self._ai_cache) > self._ai_cache_size:
+                    self._ai_cache.popitem(last=False)
+        return result
+        
+    def request_gemini_analysis(self, image, jpeg_bytes=None):
+        """Send the image to Gemini and parse its JSON reply"""
         try:
-            image_base64 = self.encode_image_base64(image)
+            image_base64 = self.encode_image_base64(image, jpeg_bytes)
             
             prompt = """You are an expert fruit quality inspector with 20+ years experience. 
             Analyze this fruit image with extreme attention to detail.
@@ -2755,7 +3120,8 @@ RESPOND IN EXACT JSON FORMAT:
                 }]
             }
 
-            response = requests.post(self.gemini_url, headers=self.headers, json=payload)
+            response = self._session.post(self.gemini_url, headers=self.headers, json=payload,
+                                          timeout=_HTTP_TIMEOUT)
             
             if response.status_code == 200:
                 result = response.json()
@@ -2773,11 +3139,28 @@ RESPOND IN EXACT JSON FORMAT:
             
         return None
         
-    def encode_image_base64(self, image):
+    def encode_image_base64(self, image, jpeg_bytes=None):
         """Encode image to base64"""
-        _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
-        return base64.b64encode(buffer).decode('utf-8')
-        
+        # id() is only trusted while the weak reference still points at the same array
+        key = id(image)
+        with self._b64_cache_lock:
+            entry = self._b64_cache.get(key)
+            if entry is not None and entry[0]() is image:
+                self._b64_cache.move_to_end(key)
+                return entry[1]
+                
+        # An image loaded from a JPEG file is sent as-is, no re-encode needed
+        if jpeg_bytes is None:
+            _, jpeg_bytes = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        encoded = base64.b64encode(jpeg_bytes).decode('utf-8')
+        
+        with self._b64_cache_lock:
+            self._b64_cache[key] = (weakref.ref(image), encoded)
+            if len(self._b64_cache) > self._b64_cache_size:
+                self._b64_cache.popitem(last=False)
+        return encoded
+        
+    @lru_cache(maxsize=32)
     def get_condition_color(self, condition):
         """Get color for condition"""
         if 'EXCELLENT' in condition:
@@ -2795,6 +3178,24 @@ RESPOND IN EXACT JSON FORMAT:
         else:
             return '#808080'
             
+    def create_notification_toast(self):
+        """Create the notification toast (hidden until needed)"""
+        self._toast = ctk.CTkFrame(
+            self.root,
+            fg_color="#2196F3",
+            corner_radius=10,
+            height=50
+        )
+        
+        self._toast_label = ctk.CTkLabel(
+            self._toast,
+            text="",
+            font=_font(size=14, weight="bold"),
+            text_color="#ffffff"
+        )
+        self._toast_label.pack(padx=20, pady=10)
+        self._toast_hide_job = None
+        
     def show_notification(self, message, type="info"):
         """Show notification"""
         colors = {
@@ -2804,24 +3205,22 @@ RESPOND IN EXACT JSON FORMAT:
             "info": "#2196F3"
         }
         
-        notification = ctk.CTkFrame(
-            self.root,
-            fg_color=colors.get(type, "#2196F3"),
-            corner_radius=10,
-            height=50
-        )
-        notification.place(relx=0.5, rely=0.95, anchor="s")
-        
-        label = ctk.CTkLabel(
-            notification,
-            text=message,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            text_color="#ffffff"
-        )
-        label.pack(padx=20, pady=10)
+        # A newer message replaces the current one and restarts its timer
+        if self._toast_hide_job is not None:
+            self.root.after_cancel(self._toast_hide_job)
+            
+        self._toast.configure(fg_color=colors.get(type, "#2196F3"))
+        self._toast_label.configure(text=message)
+        self._toast.place(relx=0.5, rely=0.95, anchor="s")
+        self._toast.lift()
         
         # Auto hide
-        self.root.after(3000, notification.destroy)
+        self._toast_hide_job = self.root.after(3000, self.hide_notification)
+        
+    def hide_notification(self):
+        """Hide the notification toast"""
+        self._toast_hide_job = None
+        self._toast.place_forget()
         
     def update_status(self, text):
         """Update status label"""
@@ -3154,9 +3553,21 @@ RESPOND IN EXACT JSON FORMAT:
         """Change image quality"""
         self.show_notification(f"Image quality set to {quality}", "info")
         
+    def post_to_ui(self, callback, *args):
+        """Run callback on the Tk thread; a no-op once the window is closing"""
+        if self._closing:
+            return
+        try:
+            self.root.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            # Root destroyed between the check and the call
+            pass
+            
     def on_closing(self):
         """Handle window closing"""
         self.camera_active = False
+        self._closing = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
         
     def run(self):